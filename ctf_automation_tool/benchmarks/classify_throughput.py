@@ -0,0 +1,151 @@
+# benchmarks/classify_throughput.py
+"""
+Challenge classification micro-benchmark: utils.parsers.classify_challenge
+against the substring if-chain it replaced, per challenge type of server.py
+and for the banner / results lines a client also receives.
+
+Run from the ctf_automation_tool directory:
+    python -m benchmarks.classify_throughput --min-time 0.5 --output classify.json
+"""
+import argparse
+import json
+import random
+import re
+import time
+
+from server import CHALLENGES, banner_message, challenge_line, results_message
+from utils.parsers import classify_challenge
+
+# The if-chain of the original solve_challenge, kept here as the baseline:
+# a substring check, then a re.search per candidate type
+
+
+def legacy_classify(text):
+    if "Binary AND:" in text:
+        match = re.search(r'Binary AND:\s*(\d+)\s+AND\s+(\d+)', text)
+        if match:
+            return "binary_and", match.groups()
+    if "Binary OR:" in text:
+        match = re.search(r'Binary OR:\s*(\d+)\s+OR\s+(\d+)', text)
+        if match:
+            return "binary_or", match.groups()
+    if "Binary XOR:" in text:
+        match = re.search(r'Binary XOR:\s*(\d+)\s+XOR\s+(\d+)', text)
+        if match:
+            return "binary_xor", match.groups()
+    if "Binary NOR" in text:
+        match = re.search(r'Binary NOR.*?:\s*(\d+)\s+NOR\s+(\d+)', text)
+        if match:
+            return "binary_nor", match.groups()
+    if "Binary NAND" in text:
+        match = re.search(r'Binary NAND.*?:\s*(\d+)\s+NAND\s+(\d+)', text)
+        if match:
+            return "binary_nand", match.groups()
+    if "Binary NOT" in text:
+        match = re.search(r'NOT\s+(\d+)', text)
+        if match:
+            return "binary_not", match.groups()
+    if "Calculate:" in text and "AND" in text and "XOR" in text:
+        match = re.search(r'\((\d+)\s+AND\s+(\d+)\)\s+XOR\s+(\d+)', text)
+        if match:
+            return "complex_logic", match.groups()
+    if "Reverse" in text:
+        match = re.search(r'Reverse this string:\s*(\w+)', text)
+        if match:
+            return "reverse", match.groups()
+    if "hex to decimal" in text:
+        match = re.search(r'0x([0-9a-fA-F]+)', text)
+        if match:
+            return "hex_to_decimal", match.groups()
+    if "base64" in text:
+        match = re.search(r'base64:\s*([A-Za-z0-9+/=]+)', text)
+        if match:
+            return "base64", match.groups()
+    if "What is" in text:
+        match = re.search(r'What is (.+)\?', text)
+        if match:
+            return "math", match.groups()
+    if "+" in text and "What is" not in text:
+        match = re.search(r'(\d+)\s*\+\s*(\d+)', text)
+        if match:
+            return "addition", match.groups()
+    if "sequence" in text and "?" in text:
+        return "sequence", tuple(re.findall(r'\d+', text))
+    return "unknown", ()
+
+
+def sample_lines(per_type=50, seed=0):
+    """
+    Returns:
+        {case: list of str lines}: one case per server challenge type, plus "banner"
+        (the banner and results lines, which are not challenges)
+    """
+    rng = random.Random(seed)
+    cases = {}
+    for challenge in CHALLENGES:
+        questions = (challenge["build"](*challenge["operands"](rng))[0] for _ in range(per_type))
+        cases[challenge["type"]] = [challenge_line(i % 12 + 1, 12, question.encode()).decode().strip()
+                                    for i, question in enumerate(questions)]
+    other = banner_message(12, 4) + results_message(7, 12)
+    cases["banner"] = [line for line in other.decode().splitlines() if line]
+    return cases
+
+
+def measure(func, lines, min_time=0.2):
+    """
+    Classifies every line repeatedly for at least min_time seconds
+    Returns:
+        seconds per line
+    """
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        for line in lines:
+            func(line)
+        calls += len(lines)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / calls
+
+
+def run_benchmark(min_time=0.2):
+    """
+    Returns:
+        {case: {"legacy_us", "new_us", "new_bytes_us", "speedup"}}; times are per line
+    """
+    report = {}
+    for name, lines in sample_lines().items():
+        encoded = [line.encode() for line in lines]
+        legacy_time = measure(legacy_classify, lines, min_time)
+        new_time = measure(classify_challenge, lines, min_time)
+        report[name] = {
+            "legacy_us": legacy_time * 1e6,
+            "new_us": new_time * 1e6,
+            "new_bytes_us": measure(classify_challenge, encoded, min_time) * 1e6,
+            "speedup": legacy_time / new_time,
+        }
+    return report
+
+
+def print_report(report):
+    print(f"{'case':<16}{'legacy us':>12}{'new us':>10}{'bytes us':>10}{'speedup':>10}")
+    for name, row in report.items():
+        print(f"{name:<16}{row['legacy_us']:>12.2f}{row['new_us']:>10.2f}{row['new_bytes_us']:>10.2f}"
+              f"{row['speedup']:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Challenge classification benchmark (if-chain vs utils.parsers)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds to time each case for")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.min_time)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# benchmarks/codec_throughput.py
+"""
+Codec micro-benchmark: throughput of the utils.encoders conversions against the
+per-byte implementations they replaced, on random input of a few sizes.
+
+Run from the ctf_automation_tool directory:
+    python -m benchmarks.codec_throughput --sizes 64 65536 4194304 --output codecs.json
+"""
+import argparse
+import base64
+import json
+import os
+import time
+
+from utils import encoders
+
+# The implementations before the table/binascii codecs, kept here as the baseline
+
+
+def legacy_bytes_to_binary(data):
+    return ''.join(format(byte, '08b') for byte in data)
+
+
+def legacy_binary_to_bytes(binary_str):
+    byte_list = [binary_str[i:i + 8] for i in range(0, len(binary_str), 8)]
+    return bytes([int(byte, 2) for byte in byte_list])
+
+
+def legacy_hex_to_binary(hex_string):
+    return bin(int(hex_string.replace('0x', ''), 16))[2:]
+
+
+def legacy_decode_base64(encoded):
+    return base64.b64decode(encoded).decode()
+
+
+def _streamed(converter):
+    return lambda data: b''.join(converter(encoders.iter_chunks(data)))
+
+
+# Random bytes folded to ASCII, so the decoded base64 payload is valid text for decode_base64
+_ASCII = bytes(i & 0x7F for i in range(256))
+
+
+def _base64_text(raw):
+    return base64.b64encode(raw.translate(_ASCII))
+
+
+# name -> (make input from random bytes, legacy function, new function)
+CASES = {
+    "bytes_to_binary": (lambda raw: raw, legacy_bytes_to_binary, encoders.bytes_to_binary),
+    "binary_to_bytes": (lambda raw: legacy_bytes_to_binary(raw), legacy_binary_to_bytes, encoders.binary_to_bytes),
+    "hex_to_binary": (lambda raw: raw.hex(), legacy_hex_to_binary, encoders.hex_to_binary),
+    "base64_decode": (_base64_text, legacy_decode_base64, encoders.decode_base64),
+    "base64_decode_streamed": (_base64_text, lambda text: legacy_decode_base64(text).encode(),
+                               _streamed(encoders.stream_base64_decode)),
+    "binary_to_bytes_streamed": (lambda raw: legacy_bytes_to_binary(raw).encode(),
+                                 lambda text: legacy_binary_to_bytes(text.decode()),
+                                 _streamed(encoders.stream_binary_to_bytes)),
+}
+
+
+def measure(func, data, min_time=0.2):
+    """
+    Calls func(data) repeatedly for at least min_time seconds
+    Returns:
+        seconds per call
+    """
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        func(data)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / calls
+
+
+def run_benchmark(sizes=(64, 65536, 1 << 20), min_time=0.2):
+    """
+    Returns:
+        {case: {size: {"legacy_mb_s", "new_mb_s", "speedup"}}}; sizes are in raw bytes
+    """
+    report = {}
+    for name, (make_input, legacy, new) in CASES.items():
+        report[name] = {}
+        for size in sizes:
+            data = make_input(os.urandom(size))
+            if legacy(data) != new(data):
+                raise AssertionError(f"{name}: legacy and new results differ")
+            legacy_time = measure(legacy, data, min_time)
+            new_time = measure(new, data, min_time)
+            report[name][size] = {
+                "legacy_mb_s": size / legacy_time / 1e6,
+                "new_mb_s": size / new_time / 1e6,
+                "speedup": legacy_time / new_time,
+            }
+    return report
+
+
+def print_report(report):
+    print(f"{'codec':<26}{'size':>10}{'legacy MB/s':>14}{'new MB/s':>12}{'speedup':>10}")
+    for name, by_size in report.items():
+        for size, row in by_size.items():
+            print(f"{name:<26}{size:>10}{row['legacy_mb_s']:>14.2f}{row['new_mb_s']:>12.2f}{row['speedup']:>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Codec throughput benchmark (legacy vs utils.encoders)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 65536, 1 << 20], help="input sizes in bytes")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds to time each case for")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.sizes, args.min_time)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
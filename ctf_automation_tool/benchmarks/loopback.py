@@ -0,0 +1,197 @@
+# benchmarks/loopback.py
+"""
+End-to-end loopback benchmark: starts server.py on 127.0.0.1 and drives it
+with the main.py client, then writes the results as JSON.
+
+Run from the ctf_automation_tool directory:
+    python -m benchmarks.loopback --sessions 200 --output bench.json
+    python -m benchmarks.loopback --baseline bench.json   # compare against an earlier run
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+
+from main import run_session
+from utils.parsers import classify_challenge
+from utils.stats import summarize_latencies
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# utils.parsers challenge type -> "type" key in server.SIMPLE_CHALLENGES / LOGICAL_CHALLENGES
+SERVER_TYPES = {
+    "binary_and": "and",
+    "binary_or": "or",
+    "binary_xor": "xor",
+    "binary_nor": "nor",
+    "binary_nand": "nand",
+    "binary_not": "not",
+    "complex_logic": "complex_logic",
+    "reverse": "reverse",
+    "hex_to_decimal": "hex",
+    "base64": "base64",
+    "math": "math",
+    "sequence": "sequence",
+}
+
+# Metrics where a larger value is better; everything else is a latency
+THROUGHPUT_METRICS = ("challenges_per_sec", "sessions_per_sec")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server_process(port, extra_args=(), ready_timeout=10.0):
+    """
+    Starts server.py on 127.0.0.1:port in a child process and waits until it accepts connections
+    Returns:
+        subprocess.Popen of the server
+    """
+    proc = subprocess.Popen(
+        [sys.executable, "server.py", "--host", "127.0.0.1", "--port", str(port), *extra_args],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + ready_timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server.py exited with code {proc.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("server.py did not start listening in time")
+
+
+async def drive(port, sessions, concurrency):
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one_session():
+        async with limit:
+            start = time.perf_counter()
+            try:
+                result = await run_session("127.0.0.1", port, verbose=False, idle_timeout=30, trace=True)
+            except (OSError, asyncio.TimeoutError):
+                result = None
+            return time.perf_counter() - start, result
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(one_session() for _ in range(sessions)))
+    return time.perf_counter() - start, outcomes
+
+
+def run_benchmark(sessions=200, concurrency=50, mode="async", pacing="turbo", pipeline=1):
+    """
+    Runs one loopback benchmark
+    Returns:
+        dict with overall throughput, round-trip latency percentiles (ms) and a per-type breakdown
+    """
+    port = free_port()
+    server = start_server_process(port, ["--mode", mode, "--pacing", pacing, "--backlog", "1024",
+                                         "--pipeline", str(pipeline), "--log-level", "silent"])
+    try:
+        elapsed, outcomes = asyncio.run(drive(port, sessions, concurrency))
+    finally:
+        server.terminate()
+        server.wait()
+    completed = [(latency, result) for latency, result in outcomes if result is not None]
+
+    per_type = {}
+    all_rtts = []
+    for _, result in completed:
+        for line, rtt in result["trace"]:
+            challenge_type = SERVER_TYPES.get(classify_challenge(line)[0], "unknown")
+            per_type.setdefault(challenge_type, []).append(rtt)
+            all_rtts.append(rtt)
+
+    challenges = sum(result["answered"] for _, result in completed)
+    return {
+        "config": {"sessions": sessions, "concurrency": concurrency, "mode": mode, "pacing": pacing,
+                   "pipeline": pipeline},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count(), "commit": git_commit()},
+        "elapsed": elapsed,
+        "challenges_per_sec": challenges / elapsed,
+        "sessions_per_sec": len(completed) / elapsed,
+        "failed_sessions": len(outcomes) - len(completed),
+        "success_rate": sum(1 for _, result in completed if result["flag"]) / len(outcomes),
+        "session_latency_ms": summarize_latencies(latency for latency, _ in completed),
+        "rtt_ms": summarize_latencies(all_rtts),
+        "rtt_ms_by_type": {t: summarize_latencies(v) for t, v in sorted(per_type.items())},
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, tolerance):
+    """
+    Compares a report against a baseline report
+    Returns:
+        list of regression descriptions (empty if none exceed the tolerance)
+    """
+    regressions = []
+    for metric in THROUGHPUT_METRICS:
+        old, new = baseline[metric], report[metric]
+        if new < old * (1 - tolerance):
+            regressions.append(f"{metric}: {old:.1f} -> {new:.1f}")
+    for pct in ("p50", "p95", "p99"):
+        old, new = baseline["rtt_ms"].get(pct), report["rtt_ms"].get(pct)
+        if old is not None and new is not None and new > old * (1 + tolerance):
+            regressions.append(f"rtt {pct}: {old:.3f}ms -> {new:.3f}ms")
+    return regressions
+
+
+def print_report(report):
+    print(f"challenges/sec: {report['challenges_per_sec']:.1f}   sessions/sec: {report['sessions_per_sec']:.1f}   "
+          f"success: {report['success_rate'] * 100:.1f}%")
+    print(f"{'type':<15}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = list(report["rtt_ms_by_type"].items()) + [("ALL", report["rtt_ms"])]
+    for challenge_type, stats in rows:
+        if stats["count"]:
+            print(f"{challenge_type:<15}{stats['count']:>8}{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['p99']:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loopback client/server benchmark")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--mode", choices=["threaded", "async"], default="async")
+    parser.add_argument("--pacing", default="turbo")
+    parser.add_argument("--pipeline", type=int, default=1, help="server pipeline window (default 1: lockstep)")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression (default 10%%)")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.sessions, args.concurrency, args.mode, args.pacing, args.pipeline)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"[REGRESSION] {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+# benchmarks/soak.py
+"""
+Load generator and soak test for the threaded server.
+
+The server runs inside this process (so its threads, RSS and open file
+descriptors can be sampled directly), while a child process opens sessions
+against it with Poisson arrivals, a configurable share of correct answers and
+optionally clients that drop the connection mid-session. After the load stops,
+the server gets --drain seconds to wind down; threads or descriptors still
+above the pre-load baseline, or RSS that kept growing under steady load, are
+reported as leaks.
+
+Run from the ctf_automation_tool directory:
+    python -m benchmarks.soak --duration 600 --rate 200 --max-concurrency 2000 --output soak.json
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+
+from server import accept_loop, make_config, open_listener
+from utils.log import setup_logging
+from utils.solver import solve_frame
+from utils.stats import summarize_latencies
+
+
+# === LOAD GENERATOR (child process) ===
+
+async def _client_session(host, port, rng, correct_ratio, abort_ratio, timeout, started, stats):
+    """One session: answers challenges (correctly with probability correct_ratio) until the server closes"""
+    abort_after = rng.randint(0, 11) if rng.random() < abort_ratio else None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        stats["failed"] += 1
+        return
+    try:
+        await asyncio.wait_for(reader.readexactly(1), timeout)
+        stats["accept"].append((started - stats["t0"], time.perf_counter() - started))
+        answered = 0
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout)
+            if not line:
+                break
+            if not line.startswith(b"[Challenge"):
+                continue
+            if abort_after is not None and answered >= abort_after:
+                writer.transport.abort()
+                stats["aborted"] += 1
+                return
+            answer = solve_frame(line.rstrip())[1] if rng.random() < correct_ratio else "WRONG"
+            writer.write(answer.encode() + b"\n")
+            answered += 1
+        stats["completed"] += 1
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        stats["failed"] += 1
+    finally:
+        writer.close()
+
+
+async def generate_load(host, port, duration, rate, max_concurrency, correct_ratio, abort_ratio, timeout, seed):
+    """
+    Starts sessions with exponentially distributed gaps (mean 1/rate) for `duration`
+    seconds, never more than max_concurrency at once, then waits for them to finish
+    Returns:
+        dict of counters and (start offset, seconds to first banner byte) accept samples
+    """
+    rng = random.Random(seed)
+    stats = {"started": 0, "completed": 0, "failed": 0, "aborted": 0, "skipped": 0,
+             "accept": [], "t0": time.perf_counter()}
+    in_flight = set()
+    deadline = stats["t0"] + duration
+    while time.perf_counter() < deadline:
+        await asyncio.sleep(rng.expovariate(rate))
+        if len(in_flight) >= max_concurrency:
+            stats["skipped"] += 1
+            continue
+        stats["started"] += 1
+        task = asyncio.create_task(_client_session(host, port, rng, correct_ratio, abort_ratio, timeout,
+                                                   time.perf_counter(), stats))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.gather(*in_flight)
+    del stats["t0"]
+    return stats
+
+
+def _load_worker(args):
+    return asyncio.run(generate_load(*args))
+
+
+# === SERVER SAMPLING ===
+
+def sample_process():
+    """
+    Returns:
+        dict with threads, rss_mb and open fds of this process (fds is None where /proc is missing)
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # peak, not current
+    try:
+        fds = len(os.listdir("/proc/self/fd"))
+    except OSError:
+        fds = None
+    return {"threads": threading.active_count(), "rss_mb": rss / (1 << 20), "fds": fds}
+
+
+def detect_leaks(baseline, final, load_samples, thread_tolerance=2, fd_tolerance=2, rss_tolerance_mb=20.0):
+    """
+    Returns:
+        list of leak descriptions (empty if none)
+    """
+    leaks = []
+    extra_threads = final["threads"] - baseline["threads"]
+    if extra_threads > thread_tolerance:
+        leaks.append(f"threads: {extra_threads} more than before the load "
+                     f"(sessions that never reached handle_client's finally)")
+    if baseline["fds"] is not None and final["fds"] - baseline["fds"] > fd_tolerance:
+        leaks.append(f"file descriptors: {final['fds'] - baseline['fds']} more than before the load")
+    # Under steady load RSS should level off: compare the last quarter with the second one
+    if len(load_samples) >= 8:
+        quarter = len(load_samples) // 4
+        early = sum(s["rss_mb"] for s in load_samples[quarter:2 * quarter]) / quarter
+        late = sum(s["rss_mb"] for s in load_samples[-quarter:]) / quarter
+        if late - early > rss_tolerance_mb:
+            leaks.append(f"rss: grew {late - early:.1f} MB between the second and last quarter of the run")
+    return leaks
+
+
+def run_soak(duration=60.0, rate=100.0, max_concurrency=1000, correct_ratio=1.0, abort_ratio=0.0,
+             interval=1.0, drain=30.0, timeout=10.0, backlog=1024, seed=None, progress=sys.stdout):
+    """
+    Runs the threaded server in-process under generated load and samples it every `interval` seconds
+    Returns:
+        report dict (config, load counters, samples, accept latency, leaks)
+    """
+    # Fork the load process before any server thread exists
+    with multiprocessing.Pool(1) as pool:
+        config = make_config("turbo", timeout=timeout, seed=seed)
+        listener = open_listener("127.0.0.1", 0, backlog)
+        port = listener.getsockname()[1]
+
+        setup_logging("silent")  # keep per-session logging out of the measurements
+        threading.Thread(target=accept_loop, args=(listener, config), daemon=True).start()
+        time.sleep(0.2)
+        baseline = sample_process()
+        start = time.perf_counter()
+        pending = pool.apply_async(_load_worker, ((
+            "127.0.0.1", port, duration, rate, max_concurrency, correct_ratio, abort_ratio, timeout, seed),))
+
+        samples = []
+        while not pending.ready():
+            pending.wait(interval)
+            sample = sample_process()
+            sample["t"] = time.perf_counter() - start
+            sample["phase"] = "load"
+            samples.append(sample)
+            print(f"[{sample['t']:7.1f}s] threads={sample['threads']:5d} rss={sample['rss_mb']:7.1f}MB "
+                  f"fds={sample['fds']}", file=progress, flush=True)
+        load = pending.get()
+
+        drain_end = time.perf_counter() + drain
+        while time.perf_counter() < drain_end:
+            final = sample_process()
+            if final["threads"] <= baseline["threads"] and (final["fds"] or 0) <= (baseline["fds"] or 0):
+                break
+            time.sleep(min(interval, drain))
+        final = sample_process()
+        final["t"] = time.perf_counter() - start
+        final["phase"] = "drained"
+        samples.append(final)
+
+        listener.shutdown(2)  # wakes the blocked accept()
+        listener.close()
+
+    load_samples = [s for s in samples if s["phase"] == "load"]
+    accept = load.pop("accept")
+    accept_by_interval = {}
+    for offset, latency in accept:
+        accept_by_interval.setdefault(int(offset // interval), []).append(latency)
+
+    return {
+        "config": {"duration": duration, "rate": rate, "max_concurrency": max_concurrency,
+                   "correct_ratio": correct_ratio, "abort_ratio": abort_ratio, "timeout": timeout, "seed": seed},
+        "load": load,
+        "baseline": baseline,
+        "final": final,
+        "samples": samples,
+        "accept_latency_ms": summarize_latencies(latency for _, latency in accept),
+        "accept_latency_ms_by_interval": {bucket * interval: summarize_latencies(values)
+                                          for bucket, values in sorted(accept_by_interval.items())},
+        "leaks": detect_leaks(baseline, final, load_samples),
+    }
+
+
+def print_report(report):
+    load = report["load"]
+    accept = report["accept_latency_ms"]
+    print(f"sessions: started={load['started']} completed={load['completed']} aborted={load['aborted']} "
+          f"failed={load['failed']} skipped={load['skipped']}")
+    if accept["count"]:
+        print(f"accept latency (ms): p50={accept['p50']:.2f} p99={accept['p99']:.2f} max={accept['max']:.2f}")
+    peak = max(report["samples"], key=lambda s: s["threads"])
+    print(f"peak threads: {peak['threads']}   baseline/final threads: {report['baseline']['threads']}/"
+          f"{report['final']['threads']}   baseline/final fds: {report['baseline']['fds']}/{report['final']['fds']}")
+    for leak in report["leaks"]:
+        print(f"[LEAK] {leak}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator / soak test for the threaded server")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of load")
+    parser.add_argument("--rate", type=float, default=100.0, help="mean new sessions per second (Poisson arrivals)")
+    parser.add_argument("--max-concurrency", type=int, default=1000, help="sessions open at once at most")
+    parser.add_argument("--correct-ratio", type=float, default=1.0, help="share of challenges answered correctly")
+    parser.add_argument("--abort-ratio", type=float, default=0.0, help="share of sessions dropped mid-way")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between samples")
+    parser.add_argument("--drain", type=float, default=30.0, help="seconds to wait for sessions to wind down")
+    parser.add_argument("--timeout", type=float, default=10.0, help="server answer timeout (seconds)")
+    parser.add_argument("--backlog", type=int, default=1024)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_soak(args.duration, args.rate, args.max_concurrency, args.correct_ratio, args.abort_ratio,
+                      args.interval, args.drain, args.timeout, args.backlog, args.seed)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if report["leaks"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/socket_latency.py
+"""
+Per-challenge round-trip time under each utils.sockopts socket profile.
+
+For every profile, server.py (threaded, turbo pacing) and a blocking client
+use that profile, and the client measures each turn: from sending an answer
+to receiving the next challenge line (or the results), which is where the
+verdict and the next question used to go out as two small writes and could
+wait on Nagle + delayed ACK.
+
+Run from the ctf_automation_tool directory:
+    python -m benchmarks.socket_latency --sessions 50
+    python -m benchmarks.socket_latency --profiles baseline low-latency --output sockopts.json
+"""
+import argparse
+import json
+import socket
+import time
+
+from benchmarks.loopback import free_port, start_server_process
+from utils.solver import solve_frame
+from utils.sockopts import SOCKET_PROFILES, apply_socket_profile
+from utils.stats import summarize_latencies
+
+
+def measure_session(port, profile, timeout=10.0):
+    """
+    Plays one lockstep session
+    Returns:
+        list of turn times in seconds (answer sent -> next challenge or results received)
+    """
+    turns = []
+    with socket.create_connection(("127.0.0.1", port), timeout=timeout) as sock:
+        apply_socket_profile(sock, profile)
+        lines = sock.makefile("rb")
+        sent_at = None
+        for line in lines:
+            if line.startswith(b"[Challenge") or line.startswith(b"You solved"):
+                if sent_at is not None:
+                    turns.append(time.perf_counter() - sent_at)
+                    sent_at = None
+                if line.startswith(b"You solved"):
+                    break
+                answer = solve_frame(line.rstrip())[1]
+                sent_at = time.perf_counter()
+                sock.sendall(answer.encode() + b"\n")
+    return turns
+
+
+def run_profile(profile, sessions):
+    """
+    Returns:
+        summarize_latencies dict of the turn times (ms) over `sessions` sessions
+    """
+    port = free_port()
+    server = start_server_process(port, ["--mode", "threaded", "--pacing", "turbo", "--log-level", "silent",
+                                         "--socket-profile", profile])
+    try:
+        turns = []
+        for _ in range(sessions):
+            turns.extend(measure_session(port, profile))
+    finally:
+        server.terminate()
+        server.wait()
+    return summarize_latencies(turns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-challenge RTT by socket profile")
+    parser.add_argument("--sessions", type=int, default=50, help="sessions per profile, played one at a time")
+    parser.add_argument("--profiles", nargs="+", choices=SOCKET_PROFILES, default=list(SOCKET_PROFILES))
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = {profile: run_profile(profile, args.sessions) for profile in args.profiles}
+    print(f"{'profile':<15}{'turns':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for profile, stats in report.items():
+        print(f"{profile:<15}{stats['count']:>8}{stats['p50']:>10.3f}{stats['p90']:>10.3f}"
+              f"{stats['p99']:>10.3f}{stats['max']:>10.3f}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# bulk_solve.py
+"""
+Offline bulk solver for challenge transcripts ("[Challenge i/N] ..." lines, as
+emitted by server.py). Writes one answer line per input line, in input order.
+
+The transcript is memory-mapped and cut into newline-aligned byte ranges; only
+the (start, end) offsets travel to the worker processes, which map the file
+themselves. At most --in-flight chunks are queued at a time, so memory use does
+not grow with the size of the input.
+
+Run from the ctf_automation_tool directory:
+    python3 bulk_solve.py transcript.txt --output answers.txt --processes 4
+"""
+import argparse
+import mmap
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+
+from utils.solver import solve_frame
+
+# Default bytes per chunk handed to a worker
+CHUNK_BYTES = 1 << 20
+
+# Per-process read-only maps of the transcripts being solved, by path
+_MAPS = {}
+
+
+def _map_file(path):
+    mapped = _MAPS.get(path)
+    if mapped is None:
+        with open(path, "rb") as f:
+            mapped = _MAPS[path] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return mapped
+
+
+def chunk_ranges(mapped, chunk_bytes=CHUNK_BYTES):
+    """
+    Splits a mapped file into ranges of about chunk_bytes that end on a line boundary
+    Returns:
+        generator of (start, end) byte offsets
+    """
+    size = len(mapped)
+    start = 0
+    while start < size:
+        newline = mapped.find(b"\n", min(start + chunk_bytes, size) - 1)
+        end = size if newline < 0 else newline + 1
+        yield start, end
+        start = end
+
+
+def solve_chunk(job):
+    """
+    Solves every line of one byte range of a transcript
+    Args:
+        job: (path, start, end)
+    Returns:
+        tuple (answer lines as bytes, lines, unknown, failed) where unknown counts lines that
+        are not a recognised challenge and failed counts recognised challenges left unsolved
+    """
+    path, start, end = job
+    data = _map_file(path)[start:end]
+    if data.endswith(b"\n"):
+        data = data[:-1]
+    out = []
+    lines = unknown = failed = 0
+    for line in data.split(b"\n"):
+        lines += 1
+        if not line.strip():
+            out.append(b"")
+            continue
+        try:
+            challenge_type, answer = solve_frame(line)
+        except Exception:
+            challenge_type, answer = None, "UNKNOWN"
+        if challenge_type == "unknown":
+            unknown += 1
+        elif answer == "UNKNOWN":
+            failed += 1
+        out.append(answer.encode(errors='replace'))
+    return b"\n".join(out) + b"\n" if out else b"", lines, unknown, failed
+
+
+def bulk_solve(input_path, output, processes=None, chunk_bytes=CHUNK_BYTES, in_flight=None):
+    """
+    Solves a whole transcript with a process pool, writing answers to `output` in order
+    Args:
+        output: binary file object
+        processes: worker processes (default: one per CPU)
+        in_flight: chunks queued at most (default: 4 per process)
+    Returns:
+        dict with lines, unknown, failed, elapsed and lines_per_sec
+    """
+    processes = processes or os.cpu_count() or 1
+    in_flight = in_flight or processes * 4
+    totals = {"lines": 0, "unknown": 0, "failed": 0}
+
+    def collect(pending_result):
+        data, lines, unknown, failed = pending_result.get()
+        output.write(data)
+        totals["lines"] += lines
+        totals["unknown"] += unknown
+        totals["failed"] += failed
+
+    start = time.perf_counter()
+    if os.path.getsize(input_path):
+        mapped = _map_file(input_path)
+        queued = deque()
+        with multiprocessing.Pool(processes) as pool:
+            for chunk_start, chunk_end in chunk_ranges(mapped, chunk_bytes):
+                if len(queued) >= in_flight:
+                    collect(queued.popleft())
+                queued.append(pool.apply_async(solve_chunk, ((input_path, chunk_start, chunk_end),)))
+            while queued:
+                collect(queued.popleft())
+    elapsed = time.perf_counter() - start
+
+    totals["elapsed"] = elapsed
+    totals["lines_per_sec"] = totals["lines"] / elapsed if elapsed else 0.0
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a challenge transcript offline")
+    parser.add_argument("input", help="transcript file, one challenge per line")
+    parser.add_argument("--output", "-o", help="answers file (default: stdout)")
+    parser.add_argument("--processes", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_BYTES, help="bytes per chunk (default 1 MiB)")
+    parser.add_argument("--in-flight", type=int, help="chunks queued at most (default: 4 per process)")
+    args = parser.parse_args()
+
+    if args.output:
+        with open(args.output, "wb") as output:
+            report = bulk_solve(args.input, output, args.processes, args.chunk_size, args.in_flight)
+    else:
+        report = bulk_solve(args.input, sys.stdout.buffer, args.processes, args.chunk_size, args.in_flight)
+        sys.stdout.flush()
+
+    print(f"lines: {report['lines']}   lines/sec: {report['lines_per_sec']:.0f}   "
+          f"unknown: {report['unknown']}   failed: {report['failed']}   elapsed: {report['elapsed']:.2f}s",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# fuzz.py
+"""
+Differential fuzzer: utils.solver against the challenge generators of server.py.
+
+Every entry of server.CHALLENGES draws its inputs with "operands"(rng) and
+builds the question and the correct answer with "build"(*operands). Worker
+processes generate cases from those generators, put each question in the
+"[Challenge i/N] ..." line format the client receives, solve it offline with
+utils.solver.solve_line (bytes path, no cache, no sockets) and compare with the
+generator's answer. Mismatches are shrunk to small reproducers: operands are
+simplified one at a time for as long as the solver still disagrees with
+"build". The per-type solves/sec (solver time only, per process) make this a
+CPU-bound benchmark for solver changes as well as a correctness gate.
+
+Run from the ctf_automation_tool directory:
+    python3 fuzz.py --cases 1000000 --processes 4
+    python3 fuzz.py --cases 200000 --types nor nand not --seed 7 --output fuzz.json
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import time
+
+from server import CHALLENGES, TOTAL_CHALLENGES, challenge_line
+from utils.solver import solve_line
+
+# Cases per task handed to a worker
+CHUNK_CASES = 20000
+# Mismatches a task sends back in full (the rest are only counted)
+MAX_SAMPLES = 5
+# Shrinking steps tried per mismatch before giving up
+MAX_SHRINK_STEPS = 2000
+
+
+def _line(question):
+    return challenge_line(1, TOTAL_CHALLENGES, question.encode()).strip()
+
+
+def check_case(challenge, operands):
+    """
+    Builds one case and solves it
+    Returns:
+        tuple (question, expected answer, solver answer)
+    """
+    question, expected = challenge["build"](*operands)
+    return question, expected, solve_line(_line(question))[1]
+
+
+def _fuzz_task(args):
+    """Worker: runs `count` cases of one challenge definition from its own seeded generator"""
+    index, seed, count = args
+    challenge = CHALLENGES[index]
+    build, draw = challenge["build"], challenge["operands"]
+    rng = random.Random(seed)
+    clock = time.perf_counter
+    solve_seconds = 0.0
+    mismatches = 0
+    samples = []
+    for _ in range(count):
+        operands = draw(rng)
+        question, expected = build(*operands)
+        line = _line(question)
+        start = clock()
+        answer = solve_line(line)[1]
+        solve_seconds += clock() - start
+        if answer != expected:
+            mismatches += 1
+            if len(samples) < MAX_SAMPLES:
+                samples.append(operands)
+    return index, count, solve_seconds, mismatches, samples
+
+
+def _shrink_candidates(value):
+    """Simpler replacements for one operand, simplest first"""
+    if isinstance(value, bool):
+        return []
+    if isinstance(value, int):
+        candidates = [0, 1, value >> 1, value & (value - 1), value - 1 if value > 0 else value + 1]
+        return [c for c in dict.fromkeys(candidates) if abs(c) < abs(value) or (abs(c) == abs(value) and c > value)]
+    if isinstance(value, str):
+        return [value[:i] + value[i + 1:] for i in range(len(value))]
+    return []
+
+
+def minimize(challenge, operands):
+    """
+    Greedily simplifies the operands of a failing case while the solver still
+    disagrees with the generator. The result may leave the generator's range
+    (e.g. 0 for a randint(8, 255) operand); the original case is kept in the report.
+    Returns:
+        tuple (operands, question, expected answer, solver answer) of the smallest case found
+    """
+    operands = tuple(operands)
+    best = (operands, *check_case(challenge, operands))
+    steps = 0
+    shrunk = True
+    while shrunk and steps < MAX_SHRINK_STEPS:
+        shrunk = False
+        for position, value in enumerate(operands):
+            for candidate in _shrink_candidates(value):
+                steps += 1
+                trial = operands[:position] + (candidate,) + operands[position + 1:]
+                try:
+                    question, expected, answer = check_case(challenge, trial)
+                except Exception:
+                    continue
+                if answer != expected:
+                    operands = trial
+                    best = (trial, question, expected, answer)
+                    shrunk = True
+                    break
+            if shrunk:
+                break
+    return best
+
+
+def run_fuzz(cases=1_000_000, processes=None, seed=None, types=None, chunk=CHUNK_CASES, max_reproducers=3):
+    """
+    Fuzzes every selected challenge definition with an equal share of `cases`
+    Args:
+        seed: base seed; every task derives its own from it, so a run is reproducible
+        types: challenge "type" names to fuzz (default: all of server.CHALLENGES)
+        max_reproducers: failing cases minimized per type
+    Returns:
+        report dict (per-type cases, mismatches, solves/sec, reproducers; totals)
+    """
+    if seed is None:
+        seed = random.randrange(1 << 32)
+    selected = [i for i, challenge in enumerate(CHALLENGES) if types is None or challenge["type"] in types]
+    if not selected:
+        raise ValueError(f"no challenge definitions match {types}")
+
+    seeds = random.Random(seed)
+    tasks = []
+    for n, index in enumerate(selected):
+        share = cases // len(selected) + (1 if n < cases % len(selected) else 0)
+        for first in range(0, share, chunk):
+            tasks.append((index, seeds.getrandbits(64), min(chunk, share - first)))
+    # Interleave the types so a slow one does not leave the other workers idle at the end
+    seeds.shuffle(tasks)
+
+    per_type = {CHALLENGES[i]["type"]: {"cases": 0, "solve_seconds": 0.0, "mismatches": 0, "samples": []}
+                for i in selected}
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        for index, count, solve_seconds, mismatches, samples in pool.imap_unordered(_fuzz_task, tasks):
+            stats = per_type[CHALLENGES[index]["type"]]
+            stats["cases"] += count
+            stats["solve_seconds"] += solve_seconds
+            stats["mismatches"] += mismatches
+            stats["samples"].extend(samples[:max_reproducers - len(stats["samples"])])
+    elapsed = time.perf_counter() - start
+
+    by_type = {challenge["type"]: challenge for challenge in CHALLENGES}
+    for challenge_type, stats in per_type.items():
+        seconds = stats.pop("solve_seconds")
+        stats["solves_per_sec"] = stats["cases"] / seconds if seconds else 0.0
+        stats["reproducers"] = []
+        for operands in stats.pop("samples"):
+            small, question, expected, answer = minimize(by_type[challenge_type], operands)
+            stats["reproducers"].append({"operands": list(operands), "minimized": list(small),
+                                         "question": question, "expected": expected, "got": answer})
+
+    total = sum(stats["cases"] for stats in per_type.values())
+    return {
+        "seed": seed,
+        "cases": total,
+        "mismatches": sum(stats["mismatches"] for stats in per_type.values()),
+        "elapsed": elapsed,
+        "cases_per_sec": total / elapsed if elapsed else 0.0,
+        "types": per_type,
+    }
+
+
+def print_report(report):
+    print(f"[FUZZ] {report['cases']} cases in {report['elapsed']:.2f}s ({report['cases_per_sec']:.0f}/sec overall), "
+          f"seed {report['seed']}")
+    print(f"  {'type':<15}{'cases':>10}{'mismatches':>12}{'solves/sec':>12}")
+    for challenge_type, stats in report["types"].items():
+        print(f"  {challenge_type:<15}{stats['cases']:>10}{stats['mismatches']:>12}{stats['solves_per_sec']:>12.0f}")
+    for challenge_type, stats in report["types"].items():
+        for reproducer in stats["reproducers"]:
+            print(f"[MISMATCH] {challenge_type} operands={tuple(reproducer['minimized'])} "
+                  f"(from {tuple(reproducer['operands'])})")
+            print(f"  question: {reproducer['question']}")
+            print(f"  expected: {reproducer['expected']!r}   got: {reproducer['got']!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Differential fuzzer: solver vs. server challenge generators")
+    parser.add_argument("--cases", type=int, default=1_000_000, help="total cases, split evenly over the types")
+    parser.add_argument("--processes", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, help="base seed (printed, so a failing run can be repeated)")
+    parser.add_argument("--types", nargs="+", metavar="TYPE",
+                        choices=[challenge["type"] for challenge in CHALLENGES], help="only fuzz these types")
+    parser.add_argument("--chunk", type=int, default=CHUNK_CASES, help="cases per worker task")
+    parser.add_argument("--reproducers", type=int, default=3, help="failing cases to minimize per type")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = run_fuzz(args.cases, args.processes, args.seed, args.types, max(args.chunk, 1), args.reproducers)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if report["mismatches"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,513 @@
-# main.py
-import socket
-from utils.solver import solve_challenge
-
-HOST = "127.0.0.1"
-PORT = 5000
-
-buf = ""
-
-with (socket.create_connection((HOST, PORT)) as s):
-    try:
-        while True:
-            data = s.recv(4096).decode(errors='ignore')
-            if not data:
-                continue
-
-            # New challenge detected - reset the buffer
-            if "[Challenge" in data:
-                buf = data
-            else:
-                buf += data
-
-            print("[SERVER]", data, end='', flush=True)
-
-            # Ignore flag messages
-            if "flag" in data.lower() or "CTF{" in data:
-                continue
-
-            # Challenge resolution
-            ans = solve_challenge(buf)
-            if ans != "UNKNOWN":
-                print("[SENT]", ans)
-                s.sendall((ans + "\n").encode())
-                buf = ""
-
-    except KeyboardInterrupt:
-        print("\n[Stopped by user]")
\ No newline at end of file
+# main.py
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+import socket
+import time
+from collections import deque
+
+from utils import solver
+from utils.cache import EVICTION_POLICIES
+from utils.framing import LineFramer, LineTooLongError
+from utils.log import LEVELS, Text, get_logger, parse_sample_rates, setup_logging, stop_logging
+from utils.metrics import StageMetrics, serve_prometheus
+from utils.offload import DEFAULT_ROUTES, SolverPool, load_routes
+from utils.parsers import classify_challenge
+from utils.sessionlog import FROM_CLIENT, FROM_SERVER, SessionRecorder
+from utils.sockopts import DEFAULT_PROFILE, SOCKET_PROFILES, apply_socket_profile, resolve_profile
+from utils.solver import solve_frame
+from utils.stats import summarize_latencies
+from utils.targets import backoff_delay, load_targets
+
+HOST = "127.0.0.1"
+PORT = 5000
+
+FLAG_RE = re.compile(rb'CTF\{[^}]*\}')
+# Banner line announcing the pipelined protocol, and the index of a challenge line
+WINDOW_RE = re.compile(rb'Pipeline window: (\d+)')
+CHALLENGE_INDEX_RE = re.compile(rb'\s*\[Challenge (\d+)/(\d+)\]')
+
+log_server = get_logger("client", "server")
+log_sent = get_logger("client", "sent")
+log_status = get_logger("client", "status")
+
+
+async def open_socket(host, port, socket_profile=DEFAULT_PROFILE):
+    """
+    Connects a non-blocking TCP socket to host:port without blocking the event loop
+    Args:
+        socket_profile: utils.sockopts profile (name or dict) applied once connected
+    """
+    loop = asyncio.get_running_loop()
+    error = OSError(f"could not resolve {host}")
+    for family, type_, proto, _, address in await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM):
+        sock = socket.socket(family, type_, proto)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, address)
+            apply_socket_profile(sock, socket_profile)
+            return sock
+        except OSError as e:
+            sock.close()
+            error = e
+    raise error
+
+
+async def _timed_solve(offload, line, classified):
+    """Returns offload.solve(line, classified) plus the seconds it took"""
+    started = time.perf_counter()
+    line_type, ans = await offload.solve(line, classified)
+    return line_type, ans, time.perf_counter() - started
+
+
+async def run_session(host=HOST, port=PORT, verbose=True, idle_timeout=None, trace=False, metrics=None,
+                      offload=None, recorder=None, socket_profile=DEFAULT_PROFILE, sock=None):
+    """
+    Connects to the challenge server and answers challenges until it closes the session.
+    Can be awaited from any asyncio program; no threads are involved.
+    Server output is received straight into a reusable buffer (utils.framing.LineFramer)
+    and handled one complete line at a time; all answers for the lines of one
+    receive go out in a single send.
+    If the banner announces a pipeline window of K challenges, answers are held
+    until the window is complete and then sent together, with an "UNKNOWN"
+    line for any challenge that could not be solved so the server's count stays aligned.
+    Args:
+        verbose: log server lines (event "server") and sent answers (event "sent") at INFO
+        idle_timeout: seconds to wait for server output before giving up
+                      (raises asyncio.TimeoutError), None to wait forever
+        trace: if True, the result also gets 'trace', a list of
+               (challenge line, seconds from challenge arrival to verdict arrival)
+        metrics: optional utils.metrics.StageMetrics; receives the time spent in
+                 each stage (recv, frame, solve, send) per challenge type.
+                 Receives that do not lead to an answer are recorded as type "none".
+        offload: optional utils.offload.SolverPool; expensive challenge types are then
+                 solved in its worker processes while the event loop keeps running
+        recorder: optional utils.sessionlog.SessionRecorder; every chunk received
+                  and sent is logged with its timestamp, for replay.py
+        socket_profile: utils.sockopts profile (name or dict) for the connection
+        sock: a socket already connected by open_socket to play on instead (host, port and
+              socket_profile are then unused); it is closed when the session ends
+    Returns:
+        dict with 'answered', 'correct' and 'flag' (None if no flag was given)
+    Raises:
+        OSError if the connection fails, including ConnectionAbortedError when the server
+        sends a line longer than LineFramer.max_line; asyncio.TimeoutError on idle_timeout
+    """
+    # Checked once per session, so a quiet client does no per-line logging work at all
+    show_server = verbose and log_server.isEnabledFor(logging.INFO)
+    show_sent = verbose and log_sent.isEnabledFor(logging.INFO)
+    loop = asyncio.get_running_loop()
+    if sock is None:
+        sock = await open_socket(host, port, socket_profile)
+    framer = LineFramer()
+    result = {"answered": 0, "correct": 0, "flag": None}
+    if trace:
+        result["trace"] = []
+    pending = deque()  # (challenge line, arrival time) waiting for their verdicts
+    window = 1
+    held = []  # answers of the current pipeline window
+
+    clock = time.perf_counter
+    try:
+        while True:
+            t_start = clock()
+            buffer = framer.get_buffer()
+            nbytes = await asyncio.wait_for(loop.sock_recv_into(sock, buffer), idle_timeout)
+            if recorder is not None and nbytes:
+                recorder.record(FROM_SERVER, buffer[:nbytes])
+            if not nbytes:
+                # EOF - the server ended the session
+                break
+            t_recv = clock()
+            framer.advance(nbytes)
+
+            answers = []
+            challenge_type = "none"
+            challenges = []  # (line, window index match or None, classification) of this receive's challenges
+            for line in framer.lines():
+                if not line:
+                    continue
+                if show_server:
+                    log_server.info("[SERVER] %s", Text(bytes(line)))
+
+                # Verdicts and the flag are not challenges
+                if line[:8] == b"Correct!" or line[:6] == b"Wrong!":
+                    result["correct"] += line[:8] == b"Correct!"
+                    if trace and pending:
+                        challenge_line, arrived = pending.popleft()
+                        result["trace"].append((challenge_line, t_recv - arrived))
+                    continue
+                flag = FLAG_RE.search(line)
+                if flag:
+                    result["flag"] = flag.group(0).decode(errors='ignore')
+                    continue
+                announced = WINDOW_RE.match(line)
+                if announced:
+                    window = int(announced.group(1))
+                    continue
+                index = CHALLENGE_INDEX_RE.match(line) if window > 1 else None
+                if window > 1 and index is None:
+                    # Banner and results lines are not window members; answering them would
+                    # desynchronise the window (or write to a server that is closing)
+                    continue
+                classified = classify_challenge(line)
+                if index is None and classified[0] == "unknown":
+                    # Banner and results lines of a lockstep session; they get no answer
+                    continue
+                challenges.append((line, index, classified))
+
+            # Challenge resolution; the offloaded solves of one receive (a pipeline
+            # window) run concurrently, and gather keeps their answers in line order
+            t_solve = clock()
+            if offload is not None:
+                solved = await asyncio.gather(*(_timed_solve(offload, line, classified)
+                                                for line, _, classified in challenges))
+            else:
+                solved = []
+                for line, _, classified in challenges:
+                    started = clock()
+                    solved.append((*solve_frame(line, classified), clock() - started))
+            solve_time = clock() - t_solve
+
+            for (line, index, _), (line_type, ans, elapsed) in zip(challenges, solved):
+                if metrics is not None:
+                    metrics.observe("solve", line_type, elapsed)
+                # index is only set for lines that arrived once a window was announced
+                if index is not None:
+                    if trace:
+                        pending.append((bytes(line).decode(errors='ignore'), t_recv))
+                    held.append(ans)
+                    challenge_type = line_type
+                    if len(held) == window or index.group(1) == index.group(2):
+                        if show_sent:
+                            log_sent.info("[SENT] %s", " ".join(held))
+                        answers.extend(held)
+                        held.clear()
+                elif ans != "UNKNOWN":
+                    if show_sent:
+                        log_sent.info("[SENT] %s", ans)
+                    if trace:
+                        pending.append((bytes(line).decode(errors='ignore'), t_recv))
+                    answers.append(ans)
+                    challenge_type = line_type
+            t_frame = clock()
+
+            if answers:
+                payload = ("\n".join(answers) + "\n").encode()
+                await loop.sock_sendall(sock, payload)
+                if recorder is not None:
+                    recorder.record(FROM_CLIENT, payload)
+                result["answered"] += sum(1 for ans in answers if ans != "UNKNOWN")
+            if metrics is not None:
+                metrics.observe("recv", challenge_type, t_recv - t_start)
+                metrics.observe("frame", challenge_type, t_frame - t_recv - solve_time)
+                if answers:
+                    metrics.observe("send", challenge_type, clock() - t_frame)
+    except LineTooLongError as e:
+        # An OSError, so the swarm and --targets callers count it as one failed session
+        raise ConnectionAbortedError(f"server sent a {e}") from e
+    finally:
+        sock.close()
+
+    return result
+
+
+# === SWARM MODE ===
+
+# Seconds a swarm session may sit without server output before it counts as failed
+SWARM_IDLE_TIMEOUT = 150
+
+
+async def _swarm_sessions(host, port, sessions, concurrency):
+    """
+    Runs `sessions` sessions with at most `concurrency` of them in flight.
+    Returns:
+        list of (latency_seconds, result dict or None if the session failed)
+    """
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one_session():
+        async with limit:
+            start = time.perf_counter()
+            try:
+                result = await run_session(host, port, verbose=False, idle_timeout=SWARM_IDLE_TIMEOUT)
+            except (OSError, asyncio.TimeoutError):
+                result = None
+            return time.perf_counter() - start, result
+
+    return await asyncio.gather(*(one_session() for _ in range(sessions)))
+
+
+def _swarm_worker(args):
+    """Entry point of a swarm worker process: one event loop per process."""
+    host, port, sessions, concurrency, use_uvloop = args
+    if use_uvloop:
+        install_uvloop()
+    return asyncio.run(_swarm_sessions(host, port, sessions, concurrency))
+
+
+def run_swarm(host=HOST, port=PORT, sessions=100, concurrency=100, processes=None, use_uvloop=False):
+    """
+    Runs many concurrent solver sessions spread over several processes,
+    each driving its share of the sessions from its own event loop.
+    Args:
+        sessions: total number of sessions to run
+        concurrency: total number of sessions in flight at any time
+        processes: number of worker processes (default: one per CPU)
+    Returns:
+        dict with throughput, success rate and session latency statistics
+    """
+    processes = max(1, min(processes or os.cpu_count() or 1, sessions))
+    jobs = []
+    for i in range(processes):
+        share = sessions // processes + (1 if i < sessions % processes else 0)
+        in_flight = max(1, concurrency // processes + (1 if i < concurrency % processes else 0))
+        jobs.append((host, port, share, in_flight, use_uvloop))
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        outcomes = [item for chunk in pool.map(_swarm_worker, jobs) for item in chunk]
+    elapsed = time.perf_counter() - start
+
+    completed = [result for _, result in outcomes if result is not None]
+    challenges = sum(result["answered"] for result in completed)
+    # The server only hands out the flag when every challenge is solved
+    flags = sum(1 for result in completed if result["flag"])
+
+    return {
+        "sessions": sessions,
+        "processes": processes,
+        "failed_connections": len(outcomes) - len(completed),
+        "elapsed": elapsed,
+        "sessions_per_sec": len(completed) / elapsed if elapsed else 0.0,
+        "challenges_per_sec": challenges / elapsed if elapsed else 0.0,
+        "success_rate": flags / sessions if sessions else 0.0,
+        "latency_ms": summarize_latencies(latency for latency, result in outcomes if result is not None),
+    }
+
+
+def print_swarm_report(report):
+    print(f"[SWARM] {report['sessions']} sessions on {report['processes']} process(es) "
+          f"in {report['elapsed']:.2f}s")
+    print(f"  sessions/sec:   {report['sessions_per_sec']:.2f}")
+    print(f"  challenges/sec: {report['challenges_per_sec']:.2f}")
+    print(f"  success rate:   {report['success_rate'] * 100:.1f}% (all challenges solved, flag received)")
+    print(f"  failed:         {report['failed_connections']}")
+    latency = report["latency_ms"]
+    if latency["count"]:
+        print(f"  latency (ms):   min={latency['min']:.1f} p50={latency['p50']:.1f} "
+              f"p90={latency['p90']:.1f} p99={latency['p99']:.1f} max={latency['max']:.1f}")
+
+
+# === MULTI-TARGET MODE ===
+
+async def _target_sessions(target, offload=None, socket_profile=DEFAULT_PROFILE, metrics=None):
+    """
+    Runs target["sessions"] sessions against one target, at most target["concurrency"] at a time.
+    A session that cannot connect (within target["idle_timeout"]) is retried up to
+    target["retries"] times. Before each retry it waits out a backoff that grows with the
+    target's consecutive failures, which all of its sessions share, so a service that is down
+    is not hammered. A session that fails once connected (a read timeout, a reset) is not
+    retried - the server has already played part of it - and counts as failed.
+    Returns:
+        per-target stats dict
+    """
+    limit = asyncio.Semaphore(target["concurrency"])
+    failures = 0  # consecutive connection failures of this target
+    stats = {"name": target["name"], "sessions": target["sessions"], "completed": 0, "flags": 0,
+             "failed": 0, "retries": 0, "answered": 0}
+    latencies = []
+
+    async def one_session():
+        nonlocal failures
+        async with limit:
+            for attempt in range(target["retries"] + 1):
+                if attempt:
+                    stats["retries"] += 1
+                if failures:
+                    await asyncio.sleep(backoff_delay(target, failures))
+                start = time.perf_counter()
+                try:
+                    sock = await asyncio.wait_for(open_socket(target["host"], target["port"], socket_profile),
+                                                  target["idle_timeout"])
+                except (OSError, asyncio.TimeoutError):
+                    failures += 1
+                    continue
+                failures = 0
+                try:
+                    result = await run_session(verbose=False, idle_timeout=target["idle_timeout"],
+                                               metrics=metrics, offload=offload, sock=sock)
+                except (OSError, asyncio.TimeoutError):
+                    break
+                latencies.append(time.perf_counter() - start)
+                stats["completed"] += 1
+                stats["answered"] += result["answered"]
+                stats["flags"] += result["flag"] is not None
+                return
+            stats["failed"] += 1
+
+    await asyncio.gather(*(one_session() for _ in range(target["sessions"])))
+    stats["success_rate"] = stats["flags"] / stats["sessions"] if stats["sessions"] else 0.0
+    stats["latency_ms"] = summarize_latencies(latencies)
+    return stats
+
+
+async def run_targets(targets, offload=None, socket_profile=DEFAULT_PROFILE, metrics=None, metrics_port=None):
+    """
+    Plays every target at once from this event loop. All sessions share this process's
+    solver and its caches (and the offload pool, if given), so more targets cost
+    connections, not solver memory.
+    Args:
+        targets: list from utils.targets.load_targets
+        metrics: optional utils.metrics.StageMetrics, fed by every session of every target
+        metrics_port: serve metrics over HTTP on this port while the targets are played
+    Returns:
+        dict with elapsed seconds and a list of per-target stats
+    """
+    exporter = asyncio.create_task(serve_prometheus(metrics, port=metrics_port)) if metrics_port else None
+    start = time.perf_counter()
+    try:
+        results = await asyncio.gather(*(_target_sessions(target, offload, socket_profile, metrics)
+                                         for target in targets))
+    finally:
+        if exporter:
+            exporter.cancel()
+    return {"elapsed": time.perf_counter() - start, "targets": results}
+
+
+def print_targets_report(report):
+    print(f"[TARGETS] {len(report['targets'])} target(s) in {report['elapsed']:.2f}s")
+    print(f"  {'target':<24}{'sessions':>9}{'flags':>7}{'failed':>8}{'retries':>9}{'p50 ms':>10}{'p99 ms':>10}")
+    for stats in report["targets"]:
+        latency = stats["latency_ms"]
+        p50, p99 = (f"{latency['p50']:.1f}", f"{latency['p99']:.1f}") if latency["count"] else ("-", "-")
+        print(f"  {stats['name']:<24}{stats['sessions']:>9}{stats['flags']:>7}{stats['failed']:>8}"
+              f"{stats['retries']:>9}{p50:>10}{p99:>10}")
+
+
+def install_uvloop():
+    """Switches asyncio to uvloop if it is installed. Returns True on success."""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+async def _run_client(host, port, metrics=None, metrics_port=None, offload=None, record=None,
+                      socket_profile=DEFAULT_PROFILE):
+    """Runs one session, serving metrics over HTTP while it lasts if metrics_port is set"""
+    exporter = asyncio.create_task(serve_prometheus(metrics, port=metrics_port)) if metrics_port else None
+    recorder = SessionRecorder(record) if record else None
+    try:
+        return await run_session(host, port, metrics=metrics, offload=offload, recorder=recorder,
+                                 socket_profile=socket_profile)
+    finally:
+        if recorder:
+            recorder.close()
+        if exporter:
+            exporter.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CTF challenge solver client")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--uvloop", action="store_true", help="use uvloop if it is installed")
+    parser.add_argument("--swarm", type=int, metavar="N", help="run N concurrent sessions and report aggregate stats")
+    parser.add_argument("--targets", metavar="PATH",
+                        help="JSON file of services to play concurrently (see utils/targets.py); "
+                             "--host/--port are ignored")
+    parser.add_argument("--concurrency", type=int, help="swarm sessions in flight at once (default: N)")
+    parser.add_argument("--processes", type=int, help="swarm worker processes (default: one per CPU)")
+    parser.add_argument("--cache-size", type=int, default=4096, help="solved challenges to remember (0 disables)")
+    parser.add_argument("--cache-policy", choices=EVICTION_POLICIES, default="lru")
+    parser.add_argument("--cache-file", help="load the cache from this JSON file and save it back on exit")
+    parser.add_argument("--metrics-json", metavar="PATH", help="dump per-stage latency histograms as JSON on exit")
+    parser.add_argument("--metrics-port", type=int, help="serve per-stage latency histograms for Prometheus on this port")
+    parser.add_argument("--record", metavar="PATH", help="log the session's byte stream for replay.py")
+    parser.add_argument("--offload", action="store_true",
+                        help="solve expensive challenge types (math, sequence, base64) in worker processes")
+    parser.add_argument("--offload-routes", metavar="PATH",
+                        help="JSON file of {type: {deadline, min_length}} routes (implies --offload)")
+    parser.add_argument("--offload-workers", type=int, help="offload worker processes (default: one per CPU)")
+    parser.add_argument("--log-level", choices=LEVELS, default="info",
+                        help="warning hides the per-challenge server lines and answers; silent logs nothing")
+    parser.add_argument("--log-sample", action="append", metavar="EVENT=RATE",
+                        help="keep only this share of EVENT records (server, sent); repeatable")
+    parser.add_argument("--socket-profile", choices=SOCKET_PROFILES, default=DEFAULT_PROFILE,
+                        help="socket options (default: TCP_NODELAY and keepalive)")
+    parser.add_argument("--rcvbuf", type=int, metavar="BYTES", help="SO_RCVBUF of the connection")
+    parser.add_argument("--sndbuf", type=int, metavar="BYTES", help="SO_SNDBUF of the connection")
+    args = parser.parse_args()
+
+    try:
+        sample_rates = parse_sample_rates(args.log_sample)
+    except ValueError as e:
+        parser.error(str(e))
+    setup_logging(args.log_level, sample_rates)
+
+    if args.uvloop and not install_uvloop():
+        log_status.warning("[uvloop not installed, using the default event loop]")
+
+    cache = solver.configure_cache(args.cache_size, args.cache_policy, args.cache_file)
+
+    if args.swarm:
+        report = run_swarm(args.host, args.port, args.swarm, args.concurrency or args.swarm,
+                           args.processes, args.uvloop)
+        stop_logging()
+        print_swarm_report(report)
+        return
+
+    targets = None
+    if args.targets:
+        try:
+            targets = load_targets(args.targets)
+        except (OSError, ValueError) as e:
+            parser.error(f"--targets: {e}")
+        if args.record:
+            # A recording holds the byte stream of one session, for replay.py
+            parser.error("--record cannot be combined with --targets")
+
+    metrics = StageMetrics() if args.metrics_json or args.metrics_port else None
+    offload = None
+    if args.offload or args.offload_routes:
+        routes = load_routes(args.offload_routes) if args.offload_routes else DEFAULT_ROUTES
+        offload = SolverPool(routes, args.offload_workers)
+    try:
+        socket_profile = resolve_profile(args.socket_profile, rcvbuf=args.rcvbuf, sndbuf=args.sndbuf)
+        if targets:
+            report = asyncio.run(run_targets(targets, offload, socket_profile, metrics, args.metrics_port))
+        else:
+            result = asyncio.run(_run_client(args.host, args.port, metrics, args.metrics_port, offload,
+                                             args.record, socket_profile))
+    except KeyboardInterrupt:
+        log_status.info("\n[Stopped by user]")
+        return
+    finally:
+        # The summary below is printed directly, after the queued log lines
+        stop_logging()
+        if offload:
+            offload.close()
+        if args.cache_file:
+            cache.save()
+        if args.metrics_json:
+            metrics.dump_json(args.metrics_json)
+    if targets:
+        print_targets_report(report)
+    else:
+        print(f"\n[Session finished] answered={result['answered']} correct={result['correct']} flag={result['flag']}")
+    stats = cache.stats()
+    print(f"[Cache] hits={stats['hits']} misses={stats['misses']} hit rate={stats['hit_rate'] * 100:.1f}% "
+          f"size={stats['size']}/{stats['maxsize']}")
+    if offload:
+        print(f"[Offload] inline={offload.stats['inline']} offloaded={offload.stats['offloaded']} "
+              f"timeouts={offload.stats['timeouts']} recycled={offload.stats['recycled']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# replay.py
+"""
+Replay server for session logs recorded with `main.py --record PATH`.
+
+Every connection gets the recorded server byte stream, either at its original
+timing or as fast as the client keeps up. Whenever the recording has the client
+sending answers, the replay reads the same number of answer lines from the
+live client and compares them with the recorded ones. The challenges are fixed,
+so runs are deterministic and comparable across solver and framing changes.
+
+Run from the ctf_automation_tool directory:
+    python3 replay.py session.log --port 5000 --speed original   # then run main.py against it
+    python3 replay.py session.log --bench 200                     # in-process max-speed benchmark
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from utils.sessionlog import FROM_CLIENT, FROM_SERVER, read_session
+
+HOST = "127.0.0.1"
+PORT = 5000
+ANSWER_TIMEOUT = 5.0
+
+
+async def replay_session(reader, writer, records, original_timing=False, timeout=ANSWER_TIMEOUT):
+    """
+    Replays one recorded session to a connected client
+    Args:
+        records: list from utils.sessionlog.read_session
+        original_timing: if True, keep the recorded gap before each server chunk
+                         (measured from the previous record, so client think time is not replayed)
+        timeout: seconds to wait for each expected answer line
+    Returns:
+        dict with answers (compared), mismatches (list of (index, expected, received)) and missing
+    """
+    result = {"answers": 0, "mismatches": [], "missing": 0}
+    previous = 0.0
+    try:
+        for offset, direction, data in records:
+            if direction == FROM_SERVER:
+                if original_timing and offset > previous:
+                    await asyncio.sleep(offset - previous)
+                writer.write(data)
+                await writer.drain()
+            elif direction == FROM_CLIENT:
+                for expected in data.splitlines():
+                    try:
+                        received = await asyncio.wait_for(reader.readline(), timeout)
+                    except asyncio.TimeoutError:
+                        received = b""
+                    if not received:
+                        result["missing"] += 1
+                        continue
+                    received = received.strip()
+                    if received != expected.strip():
+                        result["mismatches"].append((result["answers"], expected.decode(errors='ignore'),
+                                                     received.decode(errors='ignore')))
+                    result["answers"] += 1
+            previous = offset
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+    return result
+
+
+async def serve_replay(records, host=HOST, port=PORT, original_timing=False, timeout=ANSWER_TIMEOUT,
+                       sessions=None, ready=None):
+    """
+    Serves the recording to every client until `sessions` sessions are done (None: until cancelled)
+    Args:
+        ready: optional asyncio.Event set once the server is listening
+    Returns:
+        list of replay_session results
+    """
+    results = []
+    done = asyncio.Event()
+
+    async def on_connect(reader, writer):
+        result = await replay_session(reader, writer, records, original_timing, timeout)
+        results.append(result)
+        print(f"[REPLAY] session {len(results)}: {result['answers']} answers, "
+              f"{len(result['mismatches'])} mismatches, {result['missing']} missing")
+        for index, expected, received in result["mismatches"]:
+            print(f"  answer {index}: expected {expected!r}, got {received!r}")
+        if sessions is not None and len(results) >= sessions:
+            done.set()
+
+    server = await asyncio.start_server(on_connect, host, port)
+    if ready is not None:
+        ready.set()
+    async with server:
+        await done.wait()
+    return results
+
+
+async def bench(records, sessions, port=0):
+    """
+    Runs `sessions` main.py client sessions back to back against the recording at maximum speed
+    Returns:
+        dict with elapsed, sessions_per_sec, challenges_per_sec, mismatches and missing
+    """
+    from main import run_session
+
+    results = []
+
+    async def on_connect(reader, writer):
+        results.append(await replay_session(reader, writer, records))
+
+    server = await asyncio.start_server(on_connect, HOST, port)
+    port = server.sockets[0].getsockname()[1]
+    answered = 0
+    async with server:
+        start = time.perf_counter()
+        for _ in range(sessions):
+            answered += (await run_session(HOST, port, verbose=False, idle_timeout=ANSWER_TIMEOUT * 2))["answered"]
+        elapsed = time.perf_counter() - start
+        while len(results) < sessions:
+            await asyncio.sleep(0)
+    return {
+        "sessions": sessions,
+        "elapsed": elapsed,
+        "sessions_per_sec": sessions / elapsed if elapsed else 0.0,
+        "challenges_per_sec": answered / elapsed if elapsed else 0.0,
+        "mismatches": sum(len(result["mismatches"]) for result in results),
+        "missing": sum(result["missing"] for result in results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded CTF session")
+    parser.add_argument("log", help="session log written by main.py --record")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--speed", choices=["original", "max"], default="max",
+                        help="keep the recorded server timing or send as fast as the client answers")
+    parser.add_argument("--sessions", type=int, help="exit after this many sessions")
+    parser.add_argument("--timeout", type=float, default=ANSWER_TIMEOUT, help="seconds to wait for each answer")
+    parser.add_argument("--bench", type=int, metavar="N",
+                        help="run N main.py client sessions in-process at max speed and report throughput")
+    args = parser.parse_args()
+
+    records = read_session(args.log)
+
+    if args.bench:
+        report = asyncio.run(bench(records, args.bench))
+        print(f"[BENCH] {report['sessions']} sessions in {report['elapsed']:.3f}s   "
+              f"sessions/sec: {report['sessions_per_sec']:.1f}   challenges/sec: {report['challenges_per_sec']:.1f}   "
+              f"mismatches: {report['mismatches']}   missing: {report['missing']}")
+        sys.exit(1 if report["mismatches"] or report["missing"] else 0)
+
+    print(f"Replaying {args.log} ({len(records)} records) on {args.host}:{args.port}, speed {args.speed}")
+    try:
+        results = asyncio.run(serve_replay(records, args.host, args.port, args.speed == "original",
+                                           args.timeout, args.sessions))
+    except KeyboardInterrupt:
+        print("\n[SHUTDOWN] Replay stopping...")
+        return
+    if any(result["mismatches"] or result["missing"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
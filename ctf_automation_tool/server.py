@@ -1,188 +1,871 @@
-import socket
-import threading
-import time
-import random
-
-HOST = "0.0.0.0"
-PORT = 5000
-
-# Simple challenges
-SIMPLE_CHALLENGES = [
-    {
-        "type": "math",
-        "question": lambda: f"What is {random.randint(10, 100)} + {random.randint(10, 100)}?",
-        "solver": lambda q: str(eval(q.split("What is ")[1].replace("?", "")))
-    },
-    {
-        "type": "reverse",
-        "question": lambda: f"Reverse this string: {random.choice(['hello', 'world', 'python', 'ctf', 'hacker'])}",
-        "solver": lambda q: q.split("Reverse this string: ")[1][::-1]
-    },
-    {
-        "type": "base64",
-        "question": lambda: f"Decode this base64: aGVsbG8=",
-        "solver": lambda q: "hello"
-    },
-    {
-        "type": "sequence",
-        "question": lambda: f"Next number in sequence: 2, 4, 6, 8, ?",
-        "solver": lambda q: "10"
-    },
-    {
-        "type": "hex",
-        "question": lambda: f"Convert hex to decimal: {hex(random.randint(10, 255))}",
-        "solver": lambda q: str(int(q.split("Convert hex to decimal: ")[1], 16))
-    },
-]
-
-# Challenges with logical operations
-LOGICAL_CHALLENGES = [
-    {
-        "type": "and",
-        "question": lambda: (
-            lambda a, b: (f"Binary AND: {bin(a)[2:]} AND {bin(b)[2:]} = ? (answer in binary, e.g., 1010)",
-                          bin(a & b)[2:]))(random.randint(8, 255), random.randint(8, 255)),
-        "solver": lambda q: q[1] if isinstance(q, tuple) else None
-    },
-    {
-        "type": "or",
-        "question": lambda: (
-            lambda a, b: (f"Binary OR: {bin(a)[2:]} OR {bin(b)[2:]} = ? (answer in binary)", bin(a | b)[2:]))(
-            random.randint(8, 255), random.randint(8, 255)),
-        "solver": lambda q: q[1] if isinstance(q, tuple) else None
-    },
-    {
-        "type": "xor",
-        "question": lambda: (
-            lambda a, b: (f"Binary XOR: {bin(a)[2:]} XOR {bin(b)[2:]} = ? (answer in binary)", bin(a ^ b)[2:]))(
-            random.randint(8, 255), random.randint(8, 255)),
-        "solver": lambda q: q[1] if isinstance(q, tuple) else None
-    },
-    {
-        "type": "nor",
-        "question": lambda: (lambda a, b: (f"Binary NOR (8-bit): {bin(a)[2:]} NOR {bin(b)[2:]} = ? (answer in binary)",
-                                           bin(~(a | b) & 0xFF)[2:]))(random.randint(8, 255), random.randint(8, 255)),
-        "solver": lambda q: q[1] if isinstance(q, tuple) else None
-    },
-    {
-        "type": "nand",
-        "question": lambda: (
-            lambda a, b: (f"Binary NAND (8-bit): {bin(a)[2:]} NAND {bin(b)[2:]} = ? (answer in binary)",
-                          bin(~(a & b) & 0xFF)[2:]))(random.randint(8, 255), random.randint(8, 255)),
-        "solver": lambda q: q[1] if isinstance(q, tuple) else None
-    },
-    {
-        "type": "complex_logic",
-        "question": lambda: (
-            lambda a, b, c: (f"Calculate: ({bin(a)[2:]} AND {bin(b)[2:]}) XOR {bin(c)[2:]} = ? (answer in binary)",
-                             bin((a & b) ^ c)[2:]))(random.randint(8, 63), random.randint(8, 63),
-                                                    random.randint(8, 63)),
-        "solver": lambda q: q[1] if isinstance(q, tuple) else None
-    },
-    {
-        "type": "not",
-        "question": lambda: (
-            lambda a: (f"Binary NOT (8-bit): NOT {bin(a)[2:]} = ? (answer in binary)", bin(~a & 0xFF)[2:]))(
-            random.randint(8, 255)),
-        "solver": lambda q: q[1] if isinstance(q, tuple) else None
-    },
-]
-
-CHALLENGES = SIMPLE_CHALLENGES + LOGICAL_CHALLENGES
-
-def handle_client(conn, addr):
-    print(f"[NEW CONNECTION] {addr} connected")
-    try:
-        conn.sendall(b"=== CTF Challenge Server ===\n")
-        conn.sendall(b"Solve the challenges to get the flag!\n")
-        conn.sendall(b"You have 12 challenges to complete.\n")
-        conn.sendall(b"Hint: For binary operations, answer in binary format WITHOUT 0b (e.g., 1010).\n\n")
-        time.sleep(0.2)
-
-        correct_answers = 0
-        total_challenges = 12
-
-        for i in range(total_challenges):
-            if random.random() < 0.65:
-                challenge = random.choice(LOGICAL_CHALLENGES)
-            else:
-                challenge = random.choice(SIMPLE_CHALLENGES)
-
-            question_result = challenge["question"]()
-
-            if isinstance(question_result, tuple):
-                question, correct_answer = question_result[0], question_result[1]
-            else:
-                question = question_result
-                correct_answer = str(challenge["solver"](question))
-
-            msg = f"[Challenge {i + 1}/{total_challenges}] {question}\n"
-            conn.sendall(msg.encode())
-            print(f"[{addr}] Sent: {msg.strip()}")
-
-            try:
-                data = conn.recv(4096)
-                if not data:
-                    print(f"[{addr}] Connection closed by client")
-                    break
-                data = data.decode(errors='ignore').strip()
-            except socket.timeout:
-                conn.sendall(b"Timeout waiting for answer. Moving to next challenge.\n\n")
-                print(f"[{addr}] Timeout waiting for response")
-                continue
-
-            print(f"[{addr}] Received: {data} (Expected: {correct_answer})")
-
-            if data == correct_answer:
-                conn.sendall(b"Correct!\n\n")
-                correct_answers += 1
-            else:
-                conn.sendall(f"Wrong! The answer was: {correct_answer}\n\n".encode())
-
-            time.sleep(0.5)
-
-        conn.sendall(b"\n=== Results ===\n")
-        result_msg = f"You solved {correct_answers}/{total_challenges} challenges!\n"
-        conn.sendall(result_msg.encode())
-
-        if correct_answers == total_challenges:
-            flag = "CTF{DAVID_MARIES_STUFF}"
-            conn.sendall(f"Here's your flag: {flag}\n\n".encode())
-        elif correct_answers >= 5:
-            conn.sendall(b"\nClose! You need all correct for the flag!\n")
-        else:
-            conn.sendall(b"\nTry again!\n")
-
-    except Exception as e:
-        print(f"[ERROR] {addr}: {e}")
-    finally:
-        try:
-            conn.close()
-        except Exception:
-            pass
-        print(f"[DISCONNECTED] {addr}")
-
-def start_server():
-    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    server.bind((HOST, PORT))
-    server.listen(5)
-
-    print(f"CTF Challenge Server started")
-    print(f"Listening on {HOST}:{PORT}")
-    print(f"Waiting for connections...\n")
-
-    try:
-        while True:
-            conn, addr = server.accept()
-            conn.settimeout(120)
-            thread = threading.Thread(target=handle_client, args=(conn, addr), daemon=True)
-            thread.start()
-            print(f"[ACTIVE CONNECTIONS] {threading.active_count() - 1}")
-    except KeyboardInterrupt:
-        print("\n[SHUTDOWN] Server stopping...")
-    finally:
-        server.close()
-
-if __name__ == "__main__":
-    start_server()
\ No newline at end of file
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import random
+import signal
+from collections import deque
+
+from utils.framing import LineFramer
+from utils.log import LEVELS, Text, get_logger, parse_sample_rates, setup_logging, stop_logging
+from utils.sockopts import DEFAULT_PROFILE, SOCKET_PROFILES, apply_socket_profile, resolve_profile, send_coalesced
+
+HOST = "0.0.0.0"
+PORT = 5000
+
+# Per-challenge traffic (sent/received) is logged at DEBUG, so it costs nothing at the default level
+log_status = get_logger("server", "status")
+log_connection = get_logger("server", "connection")
+log_sent = get_logger("server", "sent")
+log_received = get_logger("server", "received")
+log_timeout = get_logger("server", "timeout")
+log_error = get_logger("server", "error")
+
+# Each challenge draws its random inputs with "operands"(rng) and turns them
+# into a (question, correct_answer) pair with "build"(*operands), so the same
+# challenge can be regenerated from its operands.
+
+# Simple challenges
+SIMPLE_CHALLENGES = [
+    {
+        "type": "math",
+        "operands": lambda rng: (rng.randint(10, 100), rng.randint(10, 100)),
+        "build": lambda a, b: (f"What is {a} + {b}?", str(a + b))
+    },
+    {
+        "type": "reverse",
+        "operands": lambda rng: (rng.choice(['hello', 'world', 'python', 'ctf', 'hacker']),),
+        "build": lambda word: (f"Reverse this string: {word}", word[::-1])
+    },
+    {
+        "type": "base64",
+        "operands": lambda rng: (),
+        "build": lambda: ("Decode this base64: aGVsbG8=", "hello")
+    },
+    {
+        "type": "sequence",
+        "operands": lambda rng: (),
+        "build": lambda: ("Next number in sequence: 2, 4, 6, 8, ?", "10")
+    },
+    {
+        "type": "hex",
+        "operands": lambda rng: (rng.randint(10, 255),),
+        "build": lambda n: (f"Convert hex to decimal: {hex(n)}", str(n))
+    },
+]
+
+# Challenges with logical operations
+LOGICAL_CHALLENGES = [
+    {
+        "type": "and",
+        "operands": lambda rng: (rng.randint(8, 255), rng.randint(8, 255)),
+        "build": lambda a, b: (f"Binary AND: {bin(a)[2:]} AND {bin(b)[2:]} = ? (answer in binary, e.g., 1010)",
+                               bin(a & b)[2:])
+    },
+    {
+        "type": "or",
+        "operands": lambda rng: (rng.randint(8, 255), rng.randint(8, 255)),
+        "build": lambda a, b: (f"Binary OR: {bin(a)[2:]} OR {bin(b)[2:]} = ? (answer in binary)", bin(a | b)[2:])
+    },
+    {
+        "type": "xor",
+        "operands": lambda rng: (rng.randint(8, 255), rng.randint(8, 255)),
+        "build": lambda a, b: (f"Binary XOR: {bin(a)[2:]} XOR {bin(b)[2:]} = ? (answer in binary)", bin(a ^ b)[2:])
+    },
+    {
+        "type": "nor",
+        "operands": lambda rng: (rng.randint(8, 255), rng.randint(8, 255)),
+        "build": lambda a, b: (f"Binary NOR (8-bit): {bin(a)[2:]} NOR {bin(b)[2:]} = ? (answer in binary)",
+                               bin(~(a | b) & 0xFF)[2:])
+    },
+    {
+        "type": "nand",
+        "operands": lambda rng: (rng.randint(8, 255), rng.randint(8, 255)),
+        "build": lambda a, b: (f"Binary NAND (8-bit): {bin(a)[2:]} NAND {bin(b)[2:]} = ? (answer in binary)",
+                               bin(~(a & b) & 0xFF)[2:])
+    },
+    {
+        "type": "complex_logic",
+        "operands": lambda rng: (rng.randint(8, 63), rng.randint(8, 63), rng.randint(8, 63)),
+        "build": lambda a, b, c: (f"Calculate: ({bin(a)[2:]} AND {bin(b)[2:]}) XOR {bin(c)[2:]} = ? (answer in binary)",
+                                  bin((a & b) ^ c)[2:])
+    },
+    {
+        "type": "not",
+        "operands": lambda rng: (rng.randint(8, 255),),
+        "build": lambda a: (f"Binary NOT (8-bit): NOT {bin(a)[2:]} = ? (answer in binary)", bin(~a & 0xFF)[2:])
+    },
+]
+
+CHALLENGES = SIMPLE_CHALLENGES + LOGICAL_CHALLENGES
+
+FLAG = "CTF{DAVID_MARIES_STUFF}"
+TOTAL_CHALLENGES = 12
+CLIENT_TIMEOUT = 120
+
+# Pacing profiles: seconds to wait after the banner and after each answer.
+# Every delay is drawn uniformly from [delay - jitter, delay + jitter].
+PACING_PROFILES = {
+    "classic": {"banner_delay": 0.2, "answer_delay": 0.5, "jitter": 0.0},
+    "turbo": {"banner_delay": 0.0, "answer_delay": 0.0, "jitter": 0.0},
+    "fixed": {"banner_delay": 0.5, "answer_delay": 0.5, "jitter": 0.0},
+    "jitter": {"banner_delay": 0.2, "answer_delay": 0.5, "jitter": 0.3},
+}
+
+# Listen backlog of the thread-per-client server: a short queue overflows under bursts
+# of connects and the dropped SYNs are only retried after a second
+THREADED_BACKLOG = socket.SOMAXCONN
+
+# Listen backlog and connection cap defaults for the event-loop server
+ASYNC_BACKLOG = 1024
+ASYNC_MAX_CONNECTIONS = 10000
+
+# Challenges generated per batch, and the pool size ChallengeFactory keeps topped up
+FACTORY_BATCH = 512
+FACTORY_POOL_SIZE = 8192
+
+# Per-worker session counters kept by the prefork supervisor
+COUNTER_FIELDS = ("connections", "completed", "flags")
+# Seconds between prefork supervisor checks / counter reports
+SUPERVISOR_INTERVAL = 1.0
+SUPERVISOR_REPORT_INTERVAL = 30.0
+
+def make_config(pacing="classic", delay=None, jitter=None, timeout=CLIENT_TIMEOUT, challenges=TOTAL_CHALLENGES,
+                window=1, seed=None, socket_profile=DEFAULT_PROFILE):
+    """
+    Builds the per-server session settings
+    Args:
+        pacing: name of a PACING_PROFILES entry
+        delay: overrides both delays of the profile (seconds)
+        jitter: overrides the profile jitter (seconds)
+        timeout: seconds to wait for each answer (for a whole window in pipelined mode)
+        challenges: challenges per session
+        window: challenges sent per round trip; 1 keeps the lockstep protocol
+        seed: seed of the challenge stream (None: a different stream on every run)
+        socket_profile: name of a utils.sockopts.SOCKET_PROFILES entry, or a profile dict
+    Returns:
+        dict used by handle_client / handle_client_async
+    """
+    config = dict(PACING_PROFILES[pacing])
+    if delay is not None:
+        config["banner_delay"] = config["answer_delay"] = delay
+    if jitter is not None:
+        config["jitter"] = jitter
+    config["timeout"] = timeout
+    config["challenges"] = challenges
+    config["window"] = max(window, 1)
+    config["seed"] = seed
+    config["factory"] = ChallengeFactory(seed)
+    config["counters"] = None  # WorkerCounters in prefork workers
+    config["socket"] = resolve_profile(socket_profile)
+    return config
+
+def pacing_delay(config, kind):
+    """
+    Returns the delay in seconds for 'banner' or 'answer' under this config
+    """
+    delay = config[kind + "_delay"]
+    if config["jitter"]:
+        delay += random.uniform(-config["jitter"], config["jitter"])
+    return max(delay, 0.0)
+
+def banner_message(total_challenges, window=1):
+    msg = (b"=== CTF Challenge Server ===\n"
+           b"Solve the challenges to get the flag!\n"
+           + f"You have {total_challenges} challenges to complete.\n".encode()
+           + b"Hint: For binary operations, answer in binary format WITHOUT 0b (e.g., 1010).\n")
+    if window > 1:
+        msg += f"Pipeline window: {window} (answer every challenge of a window, one line each)\n".encode()
+    return msg + b"\n"
+
+def draw_challenge(rng=random):
+    """
+    Picks a random challenge (65% logical, 35% simple)
+    Args:
+        rng: random.Random instance (or the random module) to draw from
+    Returns:
+        tuple (question, correct_answer)
+    """
+    if rng.random() < 0.65:
+        challenge = rng.choice(LOGICAL_CHALLENGES)
+    else:
+        challenge = rng.choice(SIMPLE_CHALLENGES)
+    return challenge["build"](*challenge["operands"](rng))
+
+class ChallengeFactory:
+    """
+    Pool of pre-encoded challenges, so no question is built while a client waits.
+
+    Challenges are generated in batches from a single random.Random(seed); with a
+    seed, every run hands out the same challenge stream. After start(), a daemon
+    thread refills the pool whenever it drops below half of pool_size, and next()
+    generates a batch itself only if the pool ever runs dry.
+    """
+
+    def __init__(self, seed=None, pool_size=FACTORY_POOL_SIZE, batch_size=FACTORY_BATCH):
+        self.rng = random.Random(seed)
+        self.pool_size = pool_size
+        self.batch_size = batch_size
+        self._pool = deque()
+        self._lock = threading.Lock()  # one generator at a time keeps the stream order fixed
+        self._wanted = threading.Event()
+        self._refiller = None
+
+    def _generate(self, count):
+        batch = []
+        for _ in range(count):
+            question, correct_answer = draw_challenge(self.rng)
+            batch.append(((question + "\n").encode(), correct_answer.encode()))
+        return batch
+
+    def _refill(self):
+        while len(self._pool) < self.pool_size:
+            with self._lock:
+                self._pool.extend(self._generate(self.batch_size))
+
+    def _refill_loop(self):
+        while True:
+            self._wanted.wait()
+            self._wanted.clear()
+            self._refill()
+
+    def start(self):
+        """Fills the pool and starts the refill thread (called on the first next() otherwise)"""
+        with self._lock:
+            if self._refiller is not None:
+                return
+            self._refiller = threading.Thread(target=self._refill_loop, name="challenge-factory", daemon=True)
+        self._refill()
+        self._refiller.start()
+
+    def next(self):
+        """
+        Returns:
+            tuple (question bytes ending in '\\n', correct answer bytes)
+        """
+        if self._refiller is None:
+            self.start()
+        while True:
+            try:
+                item = self._pool.popleft()
+                break
+            except IndexError:
+                with self._lock:
+                    if not self._pool:
+                        self._pool.extend(self._generate(self.batch_size))
+        if len(self._pool) < self.pool_size // 2:
+            self._wanted.set()
+        return item
+
+DEFAULT_CONFIG = make_config()
+
+def challenge_line(index, total_challenges, question):
+    """b'[Challenge 3/12] ' + question (which ends in a newline)"""
+    return b"[Challenge %d/%d] " % (index, total_challenges) + question
+
+def draw_window(factory, first, count, total_challenges):
+    """
+    Draws the challenges of one pipelined window
+    Args:
+        factory: ChallengeFactory to draw from
+        first: 0-based index of the first challenge in the window
+        count: challenges in the window
+        total_challenges: challenges per session (for the [Challenge i/N] prefix)
+    Returns:
+        tuple (list of (question, correct_answer) bytes, bytes to send)
+    """
+    batch = [factory.next() for _ in range(count)]
+    payload = b"".join(challenge_line(first + k + 1, total_challenges, question)
+                       for k, (question, _) in enumerate(batch))
+    return batch, payload
+
+def verdicts_message(addr, batch, answers):
+    """
+    Grades the answers of one pipelined window; missing answers count as timeouts
+    Returns:
+        tuple (number correct, bytes with one verdict per challenge)
+    """
+    correct = 0
+    msg = b""
+    for k, (_, correct_answer) in enumerate(batch):
+        if k >= len(answers):
+            msg += b"Timeout waiting for answer. Moving to next challenge.\n\n"
+            continue
+        log_received.debug("[%s] Received: %s (Expected: %s)", addr, Text(answers[k]), Text(correct_answer))
+        if answers[k] == correct_answer:
+            msg += b"Correct!\n\n"
+            correct += 1
+        else:
+            msg += b"Wrong! The answer was: " + correct_answer + b"\n\n"
+    return correct, msg
+
+def results_message(correct_answers, total_challenges):
+    """Builds the closing message (results and, if earned, the flag)"""
+    msg = b"\n=== Results ===\n"
+    msg += f"You solved {correct_answers}/{total_challenges} challenges!\n".encode()
+
+    if correct_answers == total_challenges:
+        msg += f"Here's your flag: {FLAG}\n\n".encode()
+    elif correct_answers >= 5:
+        msg += b"\nClose! You need all correct for the flag!\n"
+    else:
+        msg += b"\nTry again!\n"
+    return msg
+
+def count(config, field):
+    """Bumps a WorkerCounters field if this server runs as a prefork worker"""
+    if config["counters"] is not None:
+        config["counters"].add(field)
+
+def finish_session(config, correct_answers):
+    """Counts a completed session and builds its results message"""
+    count(config, "completed")
+    if correct_answers == config["challenges"]:
+        count(config, "flags")
+    return results_message(correct_answers, config["challenges"])
+
+def handle_client(conn, addr, config=DEFAULT_CONFIG):
+    log_connection.info("[NEW CONNECTION] %s connected", addr)
+    count(config, "connections")
+    coalesce = config["socket"]["coalesce"]
+    held = []  # with coalescing, messages wait here to go out with the next one in a single write
+
+    def send(msg, last=True):
+        held.append(msg)
+        if last or not coalesce:
+            if len(held) > 1:
+                send_coalesced(conn, held)
+            else:
+                conn.sendall(msg)
+            held.clear()
+
+    try:
+        total_challenges = config["challenges"]
+        delay = pacing_delay(config, "banner")
+        send(banner_message(total_challenges, config["window"]), last=bool(delay) or config["window"] > 1)
+        if delay:
+            time.sleep(delay)
+
+        if config["window"] > 1:
+            conn.sendall(finish_session(config, serve_pipelined(conn, addr, config)))
+            return
+
+        factory = config["factory"]
+        correct_answers = 0
+
+        for i in range(total_challenges):
+            question, correct_answer = factory.next()
+
+            msg = challenge_line(i + 1, total_challenges, question)
+            send(msg)
+            log_sent.debug("[%s] Sent: %s", addr, Text(msg))
+
+            try:
+                data = conn.recv(4096)
+                if not data:
+                    log_connection.info("[%s] Connection closed by client", addr)
+                    break
+                data = data.strip()
+            except socket.timeout:
+                send(b"Timeout waiting for answer. Moving to next challenge.\n\n", last=False)
+                log_timeout.info("[%s] Timeout waiting for response", addr)
+                continue
+
+            log_received.debug("[%s] Received: %s (Expected: %s)", addr, Text(data), Text(correct_answer))
+
+            # The verdict goes out with the next challenge line unless there is a pause in between
+            delay = pacing_delay(config, "answer")
+            if data == correct_answer:
+                send(b"Correct!\n\n", last=bool(delay))
+                correct_answers += 1
+            else:
+                send(b"Wrong! The answer was: " + correct_answer + b"\n\n", last=bool(delay))
+            if delay:
+                time.sleep(delay)
+
+        send(finish_session(config, correct_answers))
+
+    except Exception as e:
+        log_error.error("[ERROR] %s: %s", addr, e)
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+        log_connection.info("[DISCONNECTED] %s", addr)
+
+def serve_pipelined(conn, addr, config):
+    """
+    Pipelined session body: sends a window of challenges in one write, then
+    reads that many newline-delimited answers, however they are segmented.
+    config["timeout"] bounds the whole window, not each recv, so a client
+    trickling bytes cannot keep a window open.
+    Returns:
+        number of correct answers
+    """
+    total_challenges = config["challenges"]
+    window = config["window"]
+    framer = LineFramer(size=4096)
+    correct_answers = 0
+
+    for first in range(0, total_challenges, window):
+        batch, payload = draw_window(config["factory"], first, min(window, total_challenges - first),
+                                     total_challenges)
+        conn.sendall(payload)
+        log_sent.debug("[%s] Sent: challenges %d-%d", addr, first + 1, first + len(batch))
+
+        answers = []
+        closed = False
+        deadline = time.monotonic() + config["timeout"]
+        try:
+            while True:
+                for line in framer.lines():
+                    answer = bytes(line).strip()
+                    if answer:
+                        answers.append(answer)
+                        if len(answers) == len(batch):
+                            break
+                if len(answers) == len(batch):
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise socket.timeout
+                conn.settimeout(remaining)
+                received = conn.recv_into(framer.get_buffer())
+                if not received:
+                    log_connection.info("[%s] Connection closed by client", addr)
+                    closed = True
+                    break
+                framer.advance(received)
+        except socket.timeout:
+            log_timeout.info("[%s] Timeout waiting for response", addr)
+
+        correct, verdicts = verdicts_message(addr, batch, answers)
+        correct_answers += correct
+        if closed:
+            break
+        conn.sendall(verdicts)
+
+        delay = pacing_delay(config, "answer")
+        if delay:
+            time.sleep(delay)
+
+    return correct_answers
+
+def open_listener(host=HOST, port=PORT, backlog=THREADED_BACKLOG, reuse_port=False):
+    """
+    Creates a listening socket
+    Args:
+        reuse_port: set SO_REUSEPORT, so several processes can each bind their own
+                    listener to the port and the kernel spreads connections over them
+    """
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    server.bind((host, port))
+    server.listen(backlog)
+    return server
+
+def accept_loop(server, config=DEFAULT_CONFIG):
+    """
+    Accepts clients on a listening socket, one handle_client thread each,
+    until the socket is closed (from another thread) or accept fails
+    """
+    config["factory"].start()
+    while True:
+        try:
+            conn, addr = server.accept()
+        except OSError:
+            return
+        conn.settimeout(config["timeout"])
+        apply_socket_profile(conn, config["socket"])
+        thread = threading.Thread(target=handle_client, args=(conn, addr, config), daemon=True)
+        thread.start()
+        log_connection.debug("[ACTIVE CONNECTIONS] %d", threading.active_count() - 1)
+
+def start_server(host=HOST, port=PORT, backlog=THREADED_BACKLOG, config=DEFAULT_CONFIG):
+    server = open_listener(host, port, backlog)
+
+    log_status.info(f"CTF Challenge Server started")
+    log_status.info(f"Listening on {host}:{port}")
+    log_status.info(f"Waiting for connections...\n")
+
+    try:
+        accept_loop(server, config)
+    except KeyboardInterrupt:
+        log_status.info("\n[SHUTDOWN] Server stopping...")
+    finally:
+        server.close()
+
+# === EVENT-LOOP SERVER ===
+
+async def handle_client_async(reader, writer, config=DEFAULT_CONFIG):
+    """
+    Same challenge/answer protocol as handle_client, as a coroutine:
+    each session is a suspended state machine on the event loop instead of a thread.
+    """
+    addr = writer.get_extra_info("peername")
+    log_connection.info("[NEW CONNECTION] %s connected", addr)
+    count(config, "connections")
+    coalesce = config["socket"]["coalesce"]
+    held = []  # with coalescing, messages wait here to go out with the next one in a single write
+
+    def send(msg, last=True):
+        held.append(msg)
+        if last or not coalesce:
+            writer.writelines(held)
+            held.clear()
+
+    try:
+        total_challenges = config["challenges"]
+        delay = pacing_delay(config, "banner")
+        send(banner_message(total_challenges, config["window"]), last=bool(delay) or config["window"] > 1)
+        await writer.drain()
+        if delay:
+            await asyncio.sleep(delay)
+
+        if config["window"] > 1:
+            correct_answers = await serve_pipelined_async(reader, writer, addr, config)
+            writer.write(finish_session(config, correct_answers))
+            await writer.drain()
+            return
+
+        factory = config["factory"]
+        correct_answers = 0
+
+        for i in range(total_challenges):
+            question, correct_answer = factory.next()
+
+            msg = challenge_line(i + 1, total_challenges, question)
+            send(msg)
+            await writer.drain()
+            log_sent.debug("[%s] Sent: %s", addr, Text(msg))
+
+            try:
+                data = await asyncio.wait_for(reader.read(4096), config["timeout"])
+                if not data:
+                    log_connection.info("[%s] Connection closed by client", addr)
+                    break
+                data = data.strip()
+            except asyncio.TimeoutError:
+                send(b"Timeout waiting for answer. Moving to next challenge.\n\n", last=False)
+                log_timeout.info("[%s] Timeout waiting for response", addr)
+                continue
+
+            log_received.debug("[%s] Received: %s (Expected: %s)", addr, Text(data), Text(correct_answer))
+
+            delay = pacing_delay(config, "answer")
+            if data == correct_answer:
+                send(b"Correct!\n\n", last=bool(delay))
+                correct_answers += 1
+            else:
+                send(b"Wrong! The answer was: " + correct_answer + b"\n\n", last=bool(delay))
+            if delay:
+                await asyncio.sleep(delay)
+
+        send(finish_session(config, correct_answers))
+        await writer.drain()
+
+    except Exception as e:
+        log_error.error("[ERROR] %s: %s", addr, e)
+    finally:
+        writer.close()
+        log_connection.info("[DISCONNECTED] %s", addr)
+
+async def serve_pipelined_async(reader, writer, addr, config):
+    """Coroutine version of serve_pipelined"""
+    total_challenges = config["challenges"]
+    window = config["window"]
+    correct_answers = 0
+
+    for first in range(0, total_challenges, window):
+        batch, payload = draw_window(config["factory"], first, min(window, total_challenges - first),
+                                     total_challenges)
+        writer.write(payload)
+        await writer.drain()
+        log_sent.debug("[%s] Sent: challenges %d-%d", addr, first + 1, first + len(batch))
+
+        answers = []
+        closed = False
+        deadline = asyncio.get_running_loop().time() + config["timeout"]
+        try:
+            while len(answers) < len(batch):
+                remaining = deadline - asyncio.get_running_loop().time()
+                line = await asyncio.wait_for(reader.readline(), max(remaining, 0))
+                if not line:
+                    log_connection.info("[%s] Connection closed by client", addr)
+                    closed = True
+                    break
+                answer = line.strip()
+                if answer:
+                    answers.append(answer)
+        except asyncio.TimeoutError:
+            log_timeout.info("[%s] Timeout waiting for response", addr)
+
+        correct, verdicts = verdicts_message(addr, batch, answers)
+        correct_answers += correct
+        if closed:
+            break
+        writer.write(verdicts)
+
+        delay = pacing_delay(config, "answer")
+        if delay:
+            await asyncio.sleep(delay)
+
+    return correct_answers
+
+def _raise_fd_limit(wanted):
+    """Raises the open file limit towards `wanted` (best effort, Unix only)"""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard != resource.RLIM_INFINITY:
+        wanted = min(wanted, hard)
+    if soft != resource.RLIM_INFINITY and soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+async def serve_async(host=HOST, port=PORT, backlog=ASYNC_BACKLOG, max_connections=ASYNC_MAX_CONNECTIONS,
+                      config=DEFAULT_CONFIG, sock=None):
+    """
+    Runs the event-loop server until cancelled
+    Args:
+        backlog: listen() backlog
+        max_connections: sessions served at once; extra clients are turned away
+        sock: already listening socket to serve on instead of binding host:port
+    """
+    active = 0
+
+    async def on_connect(reader, writer):
+        nonlocal active
+        if active >= max_connections:
+            writer.write(b"Server full, try again later.\n")
+            writer.close()
+            return
+        active += 1
+        apply_socket_profile(writer.get_extra_info("socket"), config["socket"])
+        try:
+            await handle_client_async(reader, writer, config)
+        finally:
+            active -= 1
+
+    _raise_fd_limit(max_connections + 64)
+    config["factory"].start()
+    if sock is not None:
+        server = await asyncio.start_server(on_connect, sock=sock, backlog=backlog)
+    else:
+        server = await asyncio.start_server(on_connect, host, port, backlog=backlog)
+
+    log_status.info(f"CTF Challenge Server started (event loop)")
+    log_status.info(f"Listening on {host}:{port} (backlog {backlog}, max {max_connections} connections)")
+    log_status.info(f"Waiting for connections...\n")
+
+    async with server:
+        await server.serve_forever()
+
+def start_async_server(host=HOST, port=PORT, backlog=ASYNC_BACKLOG, max_connections=ASYNC_MAX_CONNECTIONS,
+                       config=DEFAULT_CONFIG):
+    try:
+        asyncio.run(serve_async(host, port, backlog, max_connections, config))
+    except KeyboardInterrupt:
+        log_status.info("\n[SHUTDOWN] Server stopping...")
+
+# === PREFORK SERVER ===
+
+class WorkerCounters:
+    """
+    One worker's slice of the supervisor's shared counter array (COUNTER_FIELDS).
+    Only this worker's threads write to it, so a local lock is enough.
+    """
+
+    def __init__(self, array, worker):
+        self.array = array
+        self.base = worker * len(COUNTER_FIELDS)
+        self._lock = threading.Lock()
+
+    def add(self, field, amount=1):
+        with self._lock:
+            self.array[self.base + COUNTER_FIELDS.index(field)] += amount
+
+def counter_totals(array, workers):
+    """
+    Returns:
+        tuple ({field: total over all workers}, [{field: value} per worker])
+    """
+    per_worker = [dict(zip(COUNTER_FIELDS, array[i * len(COUNTER_FIELDS):(i + 1) * len(COUNTER_FIELDS)]))
+                  for i in range(workers)]
+    totals = {field: sum(counts[field] for counts in per_worker) for field in COUNTER_FIELDS}
+    return totals, per_worker
+
+def _exit_with_parent(parent):
+    """
+    Ends this worker once its parent process `parent` is gone (the worker is then reparented),
+    so a supervisor killed without cleanup never leaves workers holding the port. Under
+    forkserver the parent is the fork server, which exits with the supervisor.
+    """
+    while os.getppid() == parent:
+        time.sleep(SUPERVISOR_INTERVAL)
+    stop_logging()
+    os._exit(0)
+
+def _worker_settings(config):
+    """
+    Returns:
+        copy of a make_config dict without the ChallengeFactory and counters, which hold
+        locks and threads: only plain settings are pickled to spawn / forkserver workers
+    """
+    return {key: value for key, value in config.items() if key not in ("factory", "counters")}
+
+def _prefork_worker(worker, mode, host, port, backlog, max_connections, config, counters, inherited):
+    """
+    Entry point of a prefork worker process. `config` comes without its ChallengeFactory
+    and counters (see _worker_settings); both are built here, in the worker.
+    """
+    # A forked worker inherits the supervisor's SIGTERM handler, which only runs once the main
+    # thread wakes up: a worker blocked in accept() would then outlive terminate()
+    for signum in (signal.SIGTERM, getattr(signal, "SIGHUP", None)):
+        if signum is not None:
+            signal.signal(signum, signal.SIG_DFL)
+    threading.Thread(target=_exit_with_parent, args=(os.getppid(),), name="parent-watchdog", daemon=True).start()
+    # Each worker draws its own challenge stream (seed + worker index when seeded)
+    seed = config["seed"]
+    config = dict(config, factory=ChallengeFactory(None if seed is None else seed + worker),
+                  counters=WorkerCounters(counters, worker))
+    listener = inherited if inherited is not None else open_listener(host, port, backlog, reuse_port=True)
+    try:
+        if mode == "async":
+            asyncio.run(serve_async(host, port, backlog, max_connections, config, sock=listener))
+        else:
+            accept_loop(listener, config)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop_logging()
+
+def start_prefork_server(host=HOST, port=PORT, backlog=THREADED_BACKLOG, config=DEFAULT_CONFIG, workers=None, mode="threaded",
+                         max_connections=ASYNC_MAX_CONNECTIONS):
+    """
+    Runs `workers` server processes (default: one per CPU) on the same port and supervises them.
+    Each worker binds its own SO_REUSEPORT listener; where SO_REUSEPORT is missing, the
+    supervisor binds one listener that every worker inherits. Crashed workers are restarted,
+    and the per-worker session counters are summed every SUPERVISOR_REPORT_INTERVAL seconds.
+    """
+    workers = workers or os.cpu_count() or 1
+    counters = multiprocessing.Array("q", workers * len(COUNTER_FIELDS), lock=False)
+    inherited = None if hasattr(socket, "SO_REUSEPORT") else open_listener(host, port, backlog)
+    processes = [None] * workers
+    restarts = 0
+
+    settings = _worker_settings(config)
+
+    def spawn(worker):
+        process = multiprocessing.Process(
+            target=_prefork_worker, name=f"ctf-worker-{worker}", daemon=True,
+            args=(worker, mode, host, port, backlog, max_connections, settings, counters, inherited))
+        process.start()
+        processes[worker] = process
+
+    def shut_down(signum, frame):
+        raise SystemExit(128 + signum)
+
+    # SIGTERM / SIGHUP unwind through the finally below like Ctrl-C, so the workers are always stopped
+    previous = {signum: signal.signal(signum, shut_down)
+                for signum in (signal.SIGTERM, getattr(signal, "SIGHUP", None)) if signum is not None}
+
+    for worker in range(workers):
+        spawn(worker)
+
+    log_status.info(f"CTF Challenge Server started ({workers} {mode} workers, "
+                    f"{'SO_REUSEPORT' if inherited is None else 'shared listener'})")
+    log_status.info(f"Listening on {host}:{port}")
+    log_status.info(f"Waiting for connections...\n")
+
+    next_report = time.monotonic() + SUPERVISOR_REPORT_INTERVAL
+    try:
+        while True:
+            time.sleep(SUPERVISOR_INTERVAL)
+            for worker, process in enumerate(processes):
+                if not process.is_alive():
+                    log_status.warning(f"[SUPERVISOR] worker {worker} (pid {process.pid}) exited with "
+                                       f"code {process.exitcode}, restarting")
+                    restarts += 1
+                    spawn(worker)
+            if time.monotonic() >= next_report:
+                next_report += SUPERVISOR_REPORT_INTERVAL
+                totals, _ = counter_totals(counters, workers)
+                log_status.info(f"[SUPERVISOR] {totals['connections']} connections, "
+                                f"{totals['completed']} completed, {totals['flags']} flags, {restarts} restarts")
+    except (KeyboardInterrupt, SystemExit):
+        log_status.info("\n[SHUTDOWN] Server stopping...")
+    finally:
+        for process in processes:
+            if process is not None:
+                process.terminate()
+        for process in processes:
+            if process is not None:
+                process.join()
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+        totals, per_worker = counter_totals(counters, workers)
+        for worker, counts in enumerate(per_worker):
+            log_status.info(f"[SUPERVISOR] worker {worker}: {counts['connections']} connections, "
+                            f"{counts['completed']} completed, {counts['flags']} flags")
+        log_status.info(f"[SUPERVISOR] total: {totals['connections']} connections, "
+                        f"{totals['completed']} completed, {totals['flags']} flags, {restarts} restarts")
+
+def main():
+    parser = argparse.ArgumentParser(description="CTF challenge server")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--mode", choices=["threaded", "async"], default="threaded",
+                        help="one thread per client (default) or a single event loop")
+    parser.add_argument("--backlog", type=int, help=f"listen backlog (default: {THREADED_BACKLOG} threaded, {ASYNC_BACKLOG} async)")
+    parser.add_argument("--max-connections", type=int, default=ASYNC_MAX_CONNECTIONS,
+                        help="concurrent session cap in async mode")
+    parser.add_argument("--pacing", choices=sorted(PACING_PROFILES), default="classic",
+                        help="delays between messages: classic (0.2s/0.5s), turbo (none), fixed, jitter")
+    parser.add_argument("--delay", type=float, help="override the pacing delays (seconds)")
+    parser.add_argument("--jitter", type=float, help="override the pacing jitter (seconds)")
+    parser.add_argument("--timeout", type=float, default=CLIENT_TIMEOUT, help="seconds to wait for each answer")
+    parser.add_argument("--challenges", type=int, default=TOTAL_CHALLENGES, help="challenges per session")
+    parser.add_argument("--pipeline", type=int, default=1, metavar="K",
+                        help="send K challenges per round trip (default 1: lockstep)")
+    parser.add_argument("--seed", type=int, help="seed the challenge stream for reproducible runs")
+    parser.add_argument("--workers", type=int, metavar="N",
+                        help="prefork N server processes sharing the port (0: one per CPU)")
+    parser.add_argument("--log-level", choices=LEVELS, default="info",
+                        help="debug also logs every challenge sent and answer received; silent logs nothing")
+    parser.add_argument("--log-sample", action="append", metavar="EVENT=RATE",
+                        help="keep only this share of EVENT records (sent, received, connection, ...); repeatable")
+    parser.add_argument("--socket-profile", choices=SOCKET_PROFILES, default=DEFAULT_PROFILE,
+                        help="client socket options (default: TCP_NODELAY, keepalive, coalesced writes)")
+    parser.add_argument("--rcvbuf", type=int, metavar="BYTES", help="SO_RCVBUF of client sockets")
+    parser.add_argument("--sndbuf", type=int, metavar="BYTES", help="SO_SNDBUF of client sockets")
+    args = parser.parse_args()
+
+    try:
+        sample_rates = parse_sample_rates(args.log_sample)
+    except ValueError as e:
+        parser.error(str(e))
+    setup_logging(args.log_level, sample_rates)
+
+    config = make_config(args.pacing, args.delay, args.jitter, args.timeout, args.challenges, args.pipeline,
+                         args.seed, resolve_profile(args.socket_profile, rcvbuf=args.rcvbuf, sndbuf=args.sndbuf))
+    try:
+        if args.workers is not None:
+            backlog = args.backlog or (ASYNC_BACKLOG if args.mode == "async" else THREADED_BACKLOG)
+            start_prefork_server(args.host, args.port, backlog, config, args.workers, args.mode, args.max_connections)
+        elif args.mode == "async":
+            start_async_server(args.host, args.port, args.backlog or ASYNC_BACKLOG, args.max_connections, config)
+        else:
+            start_server(args.host, args.port, args.backlog or THREADED_BACKLOG, config)
+    finally:
+        stop_logging()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# utils/arith.py
+import decimal
+import math
+import operator
+import re
+from functools import lru_cache
+
+# Limits that keep hostile input such as 9**9**9 from hanging the solver
+MAX_EXPRESSION_LENGTH = 100000
+MAX_EXPONENT = 100000
+# Longest integer (in decimal digits) a literal or any result may have. Converting
+# between int and decimal text is quadratic, so this also bounds parse_int/format_int
+# (about 30 ms each at this size).
+MAX_RESULT_DIGITS = 30000
+# The same limit in bits, checked on every intermediate result
+MAX_RESULT_BITS = int(MAX_RESULT_DIGITS * math.log2(10))
+MAX_POWER_BITS = MAX_RESULT_BITS
+# Shapes longer than this are compiled on every call instead of being cached
+MAX_CACHED_SHAPE_LENGTH = 512
+
+_NUMBER_RE = re.compile(r'[0-9]+')
+_SPACE_RE = re.compile(r'\s+')
+_TOKEN_RE = re.compile(r'\*\*|//|[_+\-*/%()]')
+
+
+def _bounded_pow(base, exponent):
+    """a ** b, refusing results that would be too large to compute quickly"""
+    if isinstance(exponent, int) and isinstance(base, int) and abs(base) > 1:
+        if exponent > MAX_EXPONENT or abs(base).bit_length() * exponent > MAX_POWER_BITS:
+            raise ValueError(f"exponent too large: {exponent}")
+    return base ** exponent
+
+
+def _bounded_mul(a, b):
+    """a * b, refusing products larger than MAX_RESULT_BITS (long * chains are quadratic)"""
+    if isinstance(a, int) and isinstance(b, int) and a.bit_length() + b.bit_length() > MAX_RESULT_BITS:
+        raise ValueError("product too large")
+    return a * b
+
+
+# operator token -> (precedence, right associative, function); same precedence as Python
+_BINARY_OPS = {
+    '+': (1, False, operator.add),
+    '-': (1, False, operator.sub),
+    '*': (2, False, _bounded_mul),
+    '/': (2, False, operator.truediv),
+    '//': (2, False, operator.floordiv),
+    '%': (2, False, operator.mod),
+    '**': (4, True, _bounded_pow),
+}
+
+# unary minus/plus bind tighter than * but looser than ** (-2**2 == -4)
+_UNARY_OPS = {
+    '-': (3, operator.neg),
+    '+': (3, operator.pos),
+}
+
+# Instruction kinds of a compiled program
+_LOAD, _UNARY, _BINARY = 0, 1, 2
+
+
+def parse_int(digits):
+    """
+    int(digits) for a decimal literal of any length. Since Python 3.11 int()
+    refuses more than sys.get_int_max_str_digits() (4300) digits; longer
+    literals are parsed through decimal, which has no such limit.
+    """
+    try:
+        return int(digits)
+    except ValueError:
+        return int(decimal.Decimal(digits))
+
+
+def format_int(value):
+    """str(value) for an int of any size (see parse_int)"""
+    try:
+        return str(value)
+    except ValueError:
+        return str(decimal.Decimal(value))
+
+
+def _tokenize(shape):
+    tokens = _TOKEN_RE.findall(shape)
+    if sum(len(token) for token in tokens) != len(shape):
+        raise ValueError("invalid character in expression")
+    return tokens
+
+
+def compile_shape(shape):
+    """
+    Compiles an expression shape, where every integer literal is replaced by '_',
+    into a postfix program. Only integers, + - * / // % **, unary +/- and
+    parentheses are accepted. Parsing is iterative (shunting-yard), so very long
+    or deeply nested expressions cannot exhaust the Python stack.
+    Args:
+        shape: e.g. '(_+_)*_'
+    Returns:
+        tuple of (kind, argument) instructions for _run
+    """
+    program = []
+    stack = []  # pending operators: (token, precedence, right_assoc, kind, function) or '('
+    slot = 0
+    expect_operand = True
+
+    for token in _tokenize(shape):
+        if expect_operand:
+            if token == '_':
+                program.append((_LOAD, slot))
+                slot += 1
+                expect_operand = False
+            elif token == '(':
+                stack.append('(')
+            elif token in _UNARY_OPS:
+                precedence, func = _UNARY_OPS[token]
+                stack.append((token, precedence, True, _UNARY, func))
+            else:
+                raise ValueError(f"unexpected '{token}'")
+        elif token == ')':
+            while stack and stack[-1] != '(':
+                program.append(stack.pop()[3:])
+            if not stack:
+                raise ValueError("unbalanced parentheses")
+            stack.pop()
+        elif token in _BINARY_OPS:
+            precedence, right_assoc, func = _BINARY_OPS[token]
+            while stack and stack[-1] != '(' and (
+                    stack[-1][1] > precedence or (stack[-1][1] == precedence and not right_assoc)):
+                program.append(stack.pop()[3:])
+            stack.append((token, precedence, right_assoc, _BINARY, func))
+            expect_operand = True
+        else:
+            raise ValueError(f"unexpected '{token}'")
+
+    if expect_operand:
+        raise ValueError("incomplete expression")
+    while stack:
+        item = stack.pop()
+        if item == '(':
+            raise ValueError("unbalanced parentheses")
+        program.append(item[3:])
+    return tuple(program)
+
+
+# Bounded by MAX_CACHED_SHAPE_LENGTH per entry, so at most a few MB
+_compile_cached = lru_cache(maxsize=4096)(compile_shape)
+
+
+def _run(program, values):
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    for kind, arg in program:
+        if kind == _LOAD:
+            value = values[arg]
+        elif kind == _BINARY:
+            right = pop()
+            value = arg(pop(), right)
+        else:
+            value = arg(pop())
+        # Caps + - // chains too, not only the operators that check their own result
+        if isinstance(value, int) and value.bit_length() > MAX_RESULT_BITS:
+            raise ValueError("intermediate result too large")
+        push(value)
+    return stack[0]
+
+
+def evaluate(expression):
+    """
+    Safely evaluates an arithmetic expression (replacement for eval())
+    Expressions with the same structure share one compiled program, so only
+    the integer literals are parsed on repeated shapes.
+    Args:
+        expression: '12 + 7 * (3 - 1)'
+    Returns:
+        int (or float when / or a negative exponent is involved)
+    Raises:
+        ValueError for unsupported or oversized input, ZeroDivisionError
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError("expression too long")
+    if '_' in expression:
+        # '_' marks the literals of a shape; one in the input would have no value
+        raise ValueError("invalid character in expression")
+    literals = _NUMBER_RE.findall(expression)
+    if any(len(n) > MAX_RESULT_DIGITS for n in literals):
+        raise ValueError("number too large")
+    values = tuple(parse_int(n) for n in literals)
+    # Numbers are replaced before spaces are dropped, so '1 2' stays invalid
+    shape = _SPACE_RE.sub('', _NUMBER_RE.sub('_', expression))
+    program = _compile_cached(shape) if len(shape) <= MAX_CACHED_SHAPE_LENGTH else compile_shape(shape)
+    return _run(program, values)
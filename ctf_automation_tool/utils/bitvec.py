@@ -0,0 +1,209 @@
+# utils/bitvec.py
+import re
+from functools import lru_cache
+
+# Padding policies for BitVector.format()
+#   'natural': no leading zeros, like bin() without '0b' (what the challenge servers expect)
+#   'width':   zero-padded to the vector's width
+PADDING_POLICIES = ("natural", "width")
+
+
+@lru_cache(maxsize=256)
+def _mask(width):
+    return (1 << width) - 1
+
+
+class BitVector:
+    """
+    Fixed-width bit vector backed by a Python int.
+
+    Parsing and formatting go through CPython's base-2 int()/format(), which are
+    linear in the number of bits, and every operation is a single big-int
+    operation plus at most one mask, so vectors thousands of bits wide cost
+    about as much as copying their bytes.
+
+    Binary operations produce a vector as wide as the wider operand; NOT, NAND
+    and NOR flip bits only within that width.
+    """
+
+    __slots__ = ("value", "width")
+
+    def __init__(self, value, width):
+        self.width = width
+        self.value = value & _mask(width)
+
+    @classmethod
+    def parse(cls, digits, width=None):
+        """
+        Args:
+            digits: binary digits as str, bytes or memoryview ('1010', b'0b1010')
+            width: bit width; defaults to the number of digits given (leading zeros count)
+        Returns:
+            BitVector
+        Raises:
+            ValueError if digits is not a binary number
+        """
+        if isinstance(digits, memoryview):
+            digits = bytes(digits)
+        digits = digits.strip()
+        if digits[:2] in ("0b", b"0b"):
+            digits = digits[2:]
+        return cls(int(digits, 2), width if width is not None else max(len(digits), 1))
+
+    @classmethod
+    def from_int(cls, value, width=None):
+        """width defaults to value.bit_length() (at least 1)"""
+        return cls(value, width if width is not None else max(value.bit_length(), 1))
+
+    @classmethod
+    def from_bytes(cls, data, width=None):
+        """Big-endian bytes; width defaults to 8 bits per byte"""
+        return cls(int.from_bytes(data, "big"), width if width is not None else len(data) * 8)
+
+    def to_bytes(self):
+        return self.value.to_bytes((self.width + 7) // 8, "big")
+
+    def format(self, padding="natural"):
+        """Binary digits without '0b', see PADDING_POLICIES"""
+        if padding == "width":
+            return format(self.value, f"0{self.width}b")
+        if padding != "natural":
+            raise ValueError(f"unknown padding policy: {padding}")
+        return format(self.value, "b")
+
+    def resize(self, width):
+        """Same value in a different width (truncated if narrower)"""
+        return BitVector(self.value, width)
+
+    def _pair(self, other):
+        if isinstance(other, int):
+            other = BitVector.from_int(other, self.width)
+        return other, max(self.width, other.width)
+
+    def __and__(self, other):
+        other, width = self._pair(other)
+        return BitVector(self.value & other.value, width)
+
+    def __or__(self, other):
+        other, width = self._pair(other)
+        return BitVector(self.value | other.value, width)
+
+    def __xor__(self, other):
+        other, width = self._pair(other)
+        return BitVector(self.value ^ other.value, width)
+
+    def __invert__(self):
+        return BitVector(self.value ^ _mask(self.width), self.width)
+
+    def nand(self, other):
+        other, width = self._pair(other)
+        return BitVector((self.value & other.value) ^ _mask(width), width)
+
+    def nor(self, other):
+        other, width = self._pair(other)
+        return BitVector((self.value | other.value) ^ _mask(width), width)
+
+    def __eq__(self, other):
+        if isinstance(other, BitVector):
+            return self.value == other.value and self.width == other.width
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.value, self.width))
+
+    def __int__(self):
+        return self.value
+
+    def __len__(self):
+        return self.width
+
+    def __repr__(self):
+        return f"BitVector('{self.format('width')}')"
+
+
+# === COMPOUND EXPRESSIONS ===
+
+_LOGIC_TOKEN_RE = re.compile(r'\s*(?:([01]+)|(NAND|NOR|AND|OR|XOR|NOT)\b|([()]))', re.I)
+
+# operator -> (precedence, function); NOT binds tightest, then AND/NAND, XOR, OR/NOR
+_LOGIC_BINARY = {
+    "AND": (3, BitVector.__and__),
+    "NAND": (3, BitVector.nand),
+    "XOR": (2, BitVector.__xor__),
+    "OR": (1, BitVector.__or__),
+    "NOR": (1, BitVector.nor),
+}
+_NOT_PRECEDENCE = 4
+
+
+def evaluate_logic(expression, bit_width=None):
+    """
+    Evaluates a logic expression on binary literals, e.g. '(1010 AND 1100) XOR NOT 0110'.
+    Parsing is iterative (shunting-yard) like utils.arith, so nesting depth is not limited
+    by the Python stack.
+    Args:
+        expression: binary literals, AND OR XOR NAND NOR NOT and parentheses (case-insensitive)
+        bit_width: width of every literal; by default each literal is as wide as it is
+                   written and binary operations widen to the wider operand
+    Returns:
+        BitVector
+    Raises:
+        ValueError for malformed expressions
+    """
+    values = []
+    ops = []  # pending operators: (name, precedence) or '('
+
+    def reduce():
+        name, _ = ops.pop()
+        if name == "NOT":
+            if not values:
+                raise ValueError("NOT without operand")
+            values.append(~values.pop())
+            return
+        if len(values) < 2:
+            raise ValueError(f"{name} without two operands")
+        right = values.pop()
+        values.append(_LOGIC_BINARY[name][1](values.pop(), right))
+
+    position = 0
+    expect_operand = True
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = _LOGIC_TOKEN_RE.match(expression, position)
+        if not match:
+            raise ValueError(f"unexpected input at {position}")
+        position = match.end()
+        literal, word, paren = match.groups()
+        word = word.upper() if word else None
+        if expect_operand:
+            if literal:
+                values.append(BitVector.parse(literal, bit_width))
+                expect_operand = False
+            elif word == "NOT":
+                ops.append(("NOT", _NOT_PRECEDENCE))
+            elif paren == "(":
+                ops.append("(")
+            else:
+                raise ValueError(f"expected an operand at {match.start()}")
+        elif paren == ")":
+            while ops and ops[-1] != "(":
+                reduce()
+            if not ops:
+                raise ValueError("unbalanced parentheses")
+            ops.pop()
+        elif word in _LOGIC_BINARY:
+            precedence = _LOGIC_BINARY[word][0]
+            while ops and ops[-1] != "(" and ops[-1][1] >= precedence:
+                reduce()
+            ops.append((word, precedence))
+            expect_operand = True
+        else:
+            raise ValueError(f"expected an operator at {match.start()}")
+
+    if expect_operand:
+        raise ValueError("incomplete expression")
+    while ops:
+        if ops[-1] == "(":
+            raise ValueError("unbalanced parentheses")
+        reduce()
+    return values[0]
@@ -0,0 +1,120 @@
+# utils/cache.py
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+# "[Challenge 3/12] " prefix - the same challenge text repeats under different numbers
+_CHALLENGE_PREFIX_RE = re.compile(rb'\s*\[Challenge \d+/\d+\]\s*')
+
+EVICTION_POLICIES = ("lru", "fifo")
+
+
+def normalize_challenge(line):
+    """
+    Builds the cache key of a challenge line
+    Args:
+        line: b'[Challenge 3/12] Reverse this string: hello' (bytes, memoryview or str)
+    Returns:
+        b'Reverse this string: hello'
+    """
+    if isinstance(line, str):
+        line = line.encode()
+    match = _CHALLENGE_PREFIX_RE.match(line)
+    return bytes(line[match.end():] if match else line).strip()
+
+
+class ResultCache:
+    """
+    Bounded map of normalized challenge bytes -> solved value, with hit/miss counters.
+    policy 'lru' evicts the least recently used entry, 'fifo' the oldest one.
+    If path is given, entries are loaded from it on creation and written back by save().
+    """
+
+    def __init__(self, maxsize=4096, policy="lru", path=None):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"unknown eviction policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def get(self, key, count_miss=True):
+        """
+        Returns the cached value or None
+        Args:
+            count_miss: False leaves a miss uncounted, for callers that only know after
+                        the lookup whether the key was a challenge at all (see record_miss)
+        """
+        with self._lock:
+            answer = self._entries.get(key)
+            if answer is None:
+                if count_miss:
+                    self.misses += 1
+                return None
+            self.hits += 1
+            if self.policy == "lru":
+                self._entries.move_to_end(key)
+            return answer
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def put(self, key, answer):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] = answer
+                if self.policy == "lru":
+                    self._entries.move_to_end(key)
+                return
+            self._entries[key] = answer
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """
+        Returns:
+            dict with hits, misses, hit_rate, size and maxsize
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+    def load(self, path=None):
+        """Loads entries saved by save(); the most recently used ones are kept if over maxsize"""
+        with open(path or self.path) as f:
+            entries = json.load(f)
+        for key, answer in entries:
+            self.put(key.encode(errors='surrogateescape'), answer)
+
+    def save(self, path=None):
+        """Writes the entries (oldest first) as JSON, replacing the file atomically"""
+        path = path or self.path
+        with self._lock:
+            entries = [(key.decode(errors='surrogateescape'), answer) for key, answer in self._entries.items()]
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, path)
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,250 +1,523 @@
-# utils/encoders.py
-import base64
-import codecs
-
-
-def hex_to_binary(hex_string):
-    """Convertește hex la binary"""
-    hex_clean = hex_string.replace('0x', '')
-    decimal = int(hex_clean, 16)
-    return bin(decimal)[2:]
-
-
-def hex_to_decimal(hex_string):
-    """Convertește hex la decimal"""
-    hex_clean = hex_string.replace('0x', '')
-    return int(hex_clean, 16)
-
-
-def decode_base64(encoded):
-    """Decodează base64"""
-    try:
-        return base64.b64decode(encoded).decode()
-    except:
-        return None
-
-
-def decode_rot13(text):
-    """Decodează ROT13"""
-    return codecs.decode(text, 'rot13')
-
-
-def reverse_string(text):
-    """Inversează un string"""
-    return text[::-1]
-
-
-# === OPERAȚII BINARE ===
-
-def binary_to_int(binary_str):
-    """
-    Convertește string binar în int
-    Args:
-        binary_str: '11010101' sau '0b11010101'
-    Returns:
-        int (213)
-    """
-    binary_clean = binary_str.replace('0b', '')
-    try:
-        return int(binary_clean, 2)
-    except ValueError:
-        return None
-
-
-def int_to_binary(num, remove_prefix=True):
-    """
-    Convertește int în string binar
-    Args:
-        num: număr întreg
-        remove_prefix: dacă True, elimină '0b'
-    Returns:
-        '11010101' sau '0b11010101'
-    """
-    result = bin(num)
-    return result[2:] if remove_prefix else result
-
-
-def binary_to_hex(binary_str):
-    """
-    Convertește binar în hex
-    Args:
-        binary_str: '11010101'
-    Returns:
-        'd5' (fără 0x)
-    """
-    decimal = binary_to_int(binary_str)
-    return hex(decimal)[2:] if decimal is not None else None
-
-
-# === OPERAȚII LOGICE PE 8-BIT ===
-
-def binary_and(a, b, bit_width=8):
-    """
-    Operație AND între două numere binare
-    Args:
-        a, b: string-uri binare ('11010101') sau int
-        bit_width: lățimea în biți (default 8)
-    Returns:
-        string binar fără '0b'
-    """
-    num_a = binary_to_int(a) if isinstance(a, str) else a
-    num_b = binary_to_int(b) if isinstance(b, str) else b
-
-    if num_a is None or num_b is None:
-        return None
-
-    result = num_a & num_b
-    return int_to_binary(result)
-
-
-def binary_or(a, b, bit_width=8):
-    """
-    Operație OR între două numere binare
-    Args:
-        a, b: string-uri binare sau int
-    Returns:
-        string binar fără '0b'
-    """
-    num_a = binary_to_int(a) if isinstance(a, str) else a
-    num_b = binary_to_int(b) if isinstance(b, str) else b
-
-    if num_a is None or num_b is None:
-        return None
-
-    result = num_a | num_b
-    return int_to_binary(result)
-
-
-def binary_xor(a, b, bit_width=8):
-    """
-    Operație XOR între două numere binare
-    Args:
-        a, b: string-uri binare sau int
-    Returns:
-        string binar fără '0b'
-    """
-    num_a = binary_to_int(a) if isinstance(a, str) else a
-    num_b = binary_to_int(b) if isinstance(b, str) else b
-
-    if num_a is None or num_b is None:
-        return None
-
-    result = num_a ^ num_b
-    return int_to_binary(result)
-
-
-def binary_not(a, bit_width=8):
-    """
-    Operație NOT pe un număr binar (cu mască pe bit_width)
-    Args:
-        a: string binar sau int
-        bit_width: lățimea în biți (default 8)
-    Returns:
-        string binar fără '0b'
-    """
-    num_a = binary_to_int(a) if isinstance(a, str) else a
-
-    if num_a is None:
-        return None
-
-    mask = (1 << bit_width) - 1  # 0xFF pentru 8-bit
-    result = ~num_a & mask
-    return int_to_binary(result)
-
-
-def binary_nand(a, b, bit_width=8):
-    """
-    Operație NAND între două numere binare
-    Args:
-        a, b: string-uri binare sau int
-        bit_width: lățimea în biți (default 8)
-    Returns:
-        string binar fără '0b'
-    """
-    num_a = binary_to_int(a) if isinstance(a, str) else a
-    num_b = binary_to_int(b) if isinstance(b, str) else b
-
-    if num_a is None or num_b is None:
-        return None
-
-    mask = (1 << bit_width) - 1  # 0xFF pentru 8-bit
-    result = ~(num_a & num_b) & mask
-    return int_to_binary(result)
-
-
-def binary_nor(a, b, bit_width=8):
-    """
-    Operație NOR între două numere binare
-    Args:
-        a, b: string-uri binare sau int
-        bit_width: lățimea în biți (default 8)
-    Returns:
-        string binar fără '0b'
-    """
-    num_a = binary_to_int(a) if isinstance(a, str) else a
-    num_b = binary_to_int(b) if isinstance(b, str) else b
-
-    if num_a is None or num_b is None:
-        return None
-
-    mask = (1 << bit_width) - 1  # 0xFF pentru 8-bit
-    result = ~(num_a | num_b) & mask
-    return int_to_binary(result)
-
-
-def complex_binary_logic(a, b, c, bit_width=8):
-    """
-    Calculează (a AND b) XOR c
-    Args:
-        a, b, c: string-uri binare sau int
-        bit_width: lățimea în biți (default 8)
-    Returns:
-        string binar fără '0b'
-    """
-    num_a = binary_to_int(a) if isinstance(a, str) else a
-    num_b = binary_to_int(b) if isinstance(b, str) else b
-    num_c = binary_to_int(c) if isinstance(c, str) else c
-
-    if num_a is None or num_b is None or num_c is None:
-        return None
-
-    result = (num_a & num_b) ^ num_c
-    return int_to_binary(result)
-
-
-# === FUNCȚII UTILITARE ===
-
-def pad_binary(binary_str, width=8):
-    """
-    Adaugă zerouri la stânga pentru a ajunge la width biți
-    Args:
-        binary_str: '1010'
-        width: 8
-    Returns:
-        '00001010'
-    """
-    return binary_str.zfill(width)
-
-
-def binary_to_bytes(binary_str):
-    """
-    Convertește string binar în bytes
-    Args:
-        binary_str: '01001000' (H în ASCII)
-    Returns:
-        b'H'
-    """
-    # Împarte în grupuri de 8 biți
-    byte_list = [binary_str[i:i + 8] for i in range(0, len(binary_str), 8)]
-    return bytes([int(byte, 2) for byte in byte_list])
-
-
-def bytes_to_binary(data):
-    """
-    Convertește bytes în string binar
-    Args:
-        data: b'Hello'
-    Returns:
-        '0100100001100101011011000110110001101111'
-    """
-    return ''.join(format(byte, '08b') for byte in data)
\ No newline at end of file
+# utils/encoders.py
+import binascii
+import codecs
+
+try:
+    import numpy as np
+except ImportError:  # NumPy e opțional - doar batch_binary_logic cu array-uri îl cere
+    np = None
+
+from utils.bitvec import BitVector, evaluate_logic
+
+
+# === TABELE DE CONVERSIE ===
+
+# octet -> cei 8 biți ai lui, ca str și ca bytes ASCII
+_BYTE_BITS = tuple(format(i, '08b') for i in range(256))
+_BYTE_BITS_ASCII = tuple(bits.encode() for bits in _BYTE_BITS)
+
+# Până la atâția octeți tabelul e mai rapid; peste, conversia printr-un singur
+# int mare (liniară în CPython pentru baze puteri ale lui 2) câștigă
+_TABLE_MAX_BYTES = 8
+
+# hex de 1-2 cifre (cu sau fără '0x', litere mici sau mari) -> binar fără zerouri în față,
+# cazul întrebărilor "Convert hex to decimal" de 8 biți
+_HEX_BITS = {}
+for _i in range(256):
+    for _digits in {format(_i, 'x'), format(_i, '02x'), format(_i, 'X'), format(_i, '02X')}:
+        _HEX_BITS[_digits] = _HEX_BITS['0x' + _digits] = _HEX_BITS['0X' + _digits] = format(_i, 'b')
+del _i, _digits
+
+# Spațiile albe ignorate de base64. translate copiază mereu, așa că pe bucăți mai mari
+# de atât se caută întâi (memchr) dacă există vreunul
+_BASE64_WHITESPACE = b' \t\r\n'
+_WHITESPACE_SCAN_MIN_BYTES = 4096
+
+
+def _as_bytes(data):
+    """str / memoryview / bytearray -> bytes (fără copie pentru bytes)"""
+    if isinstance(data, str):
+        return data.encode()
+    return data if isinstance(data, bytes) else bytes(data)
+
+
+def hex_to_binary(hex_string):
+    """Convertește hex la binary ('0xd5' sau b'd5' -> '11010101')"""
+    if isinstance(hex_string, str):
+        bits = _HEX_BITS.get(hex_string)
+        if bits is not None:
+            return bits
+    return bin(hex_to_decimal(hex_string))[2:]
+
+
+def hex_to_decimal(hex_string):
+    """Convertește hex la decimal; acceptă str, bytes sau memoryview, cu sau fără '0x'"""
+    # int() primește direct str și bytes; doar memoryview / bytearray se copiază
+    return int(hex_string if isinstance(hex_string, (str, bytes)) else bytes(hex_string), 16)
+
+
+def hex_to_bytes(hex_string):
+    """Convertește hex (număr par de cifre, fără '0x') în bytes, prin binascii"""
+    return binascii.unhexlify(_as_bytes(hex_string))
+
+
+def bytes_to_hex(data):
+    """Convertește bytes (sau memoryview) în hex fără '0x'"""
+    return binascii.hexlify(data).decode()
+
+
+def decode_base64(encoded):
+    """Decodează base64; None dacă intrarea nu e base64 valid (sau e None)"""
+    try:
+        return binascii.a2b_base64(encoded).decode()
+    except (binascii.Error, ValueError, TypeError):
+        return None
+
+
+def decode_rot13(text):
+    """Decodează ROT13"""
+    return codecs.decode(text, 'rot13')
+
+
+def reverse_string(text):
+    """Inversează un string"""
+    return text[::-1]
+
+
+# === OPERAȚII BINARE ===
+
+def binary_to_int(binary_str):
+    """
+    Convertește string binar în int
+    Args:
+        binary_str: '11010101' sau '0b11010101'
+    Returns:
+        int (213)
+    """
+    binary_clean = binary_str.replace('0b', '')
+    try:
+        return int(binary_clean, 2)
+    except ValueError:
+        return None
+
+
+def int_to_binary(num, remove_prefix=True):
+    """
+    Convertește int în string binar
+    Args:
+        num: număr întreg
+        remove_prefix: dacă True, elimină '0b'
+    Returns:
+        '11010101' sau '0b11010101'
+    """
+    result = bin(num)
+    return result[2:] if remove_prefix else result
+
+
+def binary_to_hex(binary_str):
+    """
+    Convertește binar în hex
+    Args:
+        binary_str: '11010101'
+    Returns:
+        'd5' (fără 0x)
+    """
+    decimal = binary_to_int(binary_str)
+    return hex(decimal)[2:] if decimal is not None else None
+
+
+# === OPERAȚII LOGICE (8-BIT ȘI MAI LATE) ===
+
+def _vector(x, bit_width):
+    """
+    Convertește un operand în BitVector
+    Args:
+        x: string binar ('11010101', '0b1101'), bytes sau int
+        bit_width: lățimea - operandul e mascat la ea; None = fără lățime fixă: cel puțin
+                   8 biți, lărgit la lungimea operandului (ca să nu fie trunchiat)
+    Returns:
+        BitVector sau None dacă operandul nu e binar
+    """
+    if isinstance(x, int):
+        vector = BitVector.from_int(x)
+    else:
+        try:
+            vector = BitVector.parse(x)
+        except (ValueError, TypeError):
+            return None
+    if bit_width is None:
+        return vector.resize(max(8, vector.width))
+    return vector.resize(bit_width)
+
+
+def _byte_value(x):
+    """int 0-255 sau string de cel mult 8 cifre binare -> int; altfel None"""
+    if type(x) is int:
+        return x if 0 <= x <= 0xFF else None
+    if type(x) is str and 0 < len(x) <= 8 and not x.strip('01'):
+        return int(x, 2)
+    return None
+
+
+def _logic(operation, operands, bit_width):
+    # Calea rapidă: operanzi de 8 biți (cazul obișnuit) direct ca int-uri, fără BitVector.
+    # Fără lățime fixă, operanzii de cel mult 8 biți lucrează tot pe 8 biți.
+    if bit_width == 8 or bit_width is None:
+        values = [_byte_value(x) for x in operands]
+        if None not in values:
+            return bin(BATCH_OPERATIONS[operation](*values) & 0xFF)[2:]
+    vectors = [_vector(x, bit_width) for x in operands]
+    if any(v is None for v in vectors):
+        return None
+    return _VECTOR_OPERATIONS[operation](*vectors).format()
+
+
+def binary_and(a, b, bit_width=8):
+    """
+    Operație AND între două numere binare
+    Args:
+        a, b: string-uri binare ('11010101') sau int
+        bit_width: lățimea în biți (default 8); operanzii și rezultatul sunt mascați la ea.
+                   None = fără lățime fixă (cel puțin 8, lărgită la operanzi)
+    Returns:
+        string binar fără '0b'
+    """
+    return _logic('and', (a, b), bit_width)
+
+
+def binary_or(a, b, bit_width=8):
+    """
+    Operație OR între două numere binare
+    Args:
+        a, b: string-uri binare sau int
+    Returns:
+        string binar fără '0b'
+    """
+    return _logic('or', (a, b), bit_width)
+
+
+def binary_xor(a, b, bit_width=8):
+    """
+    Operație XOR între două numere binare
+    Args:
+        a, b: string-uri binare sau int
+    Returns:
+        string binar fără '0b'
+    """
+    return _logic('xor', (a, b), bit_width)
+
+
+def binary_not(a, bit_width=8):
+    """
+    Operație NOT pe un număr binar (cu mască pe bit_width)
+    Args:
+        a: string binar sau int
+        bit_width: lățimea în biți (default 8); None = fără lățime fixă (cel puțin 8, lărgită la operand)
+    Returns:
+        string binar fără '0b'
+    """
+    return _logic('not', (a,), bit_width)
+
+
+def binary_nand(a, b, bit_width=8):
+    """
+    Operație NAND între două numere binare
+    Args:
+        a, b: string-uri binare sau int
+        bit_width: lățimea în biți (default 8); None = fără lățime fixă (cel puțin 8, lărgită la operanzi)
+    Returns:
+        string binar fără '0b'
+    """
+    return _logic('nand', (a, b), bit_width)
+
+
+def binary_nor(a, b, bit_width=8):
+    """
+    Operație NOR între două numere binare
+    Args:
+        a, b: string-uri binare sau int
+        bit_width: lățimea în biți (default 8); None = fără lățime fixă (cel puțin 8, lărgită la operanzi)
+    Returns:
+        string binar fără '0b'
+    """
+    return _logic('nor', (a, b), bit_width)
+
+
+def complex_binary_logic(a, b, c, bit_width=8):
+    """
+    Calculează (a AND b) XOR c
+    Args:
+        a, b, c: string-uri binare sau int
+        bit_width: lățimea în biți (default 8); None = fără lățime fixă (cel puțin 8, lărgită la operanzi)
+    Returns:
+        string binar fără '0b'
+    """
+    return _logic('complex', (a, b, c), bit_width)
+
+
+def binary_expression(expression, bit_width=None):
+    """
+    Evaluează o expresie logică compusă pe literali binari
+    Args:
+        expression: '(1010 AND 1100) XOR NOT 0110' (AND, OR, XOR, NAND, NOR, NOT, paranteze)
+        bit_width: lățimea fiecărui literal (implicit: câte cifre are)
+    Returns:
+        string binar fără '0b' sau None dacă expresia nu e validă
+    """
+    try:
+        return evaluate_logic(expression, bit_width).format()
+    except ValueError:
+        return None
+
+
+# === FUNCȚII UTILITARE ===
+
+def pad_binary(binary_str, width=8):
+    """
+    Adaugă zerouri la stânga pentru a ajunge la width biți
+    Args:
+        binary_str: '1010'
+        width: 8
+    Returns:
+        '00001010'
+    """
+    return binary_str.zfill(width)
+
+
+def binary_to_bytes(binary_str):
+    """
+    Convertește string binar în bytes
+    Args:
+        binary_str: '01001000' (H în ASCII); str, bytes sau memoryview
+    Returns:
+        b'H' - câte un octet la fiecare 8 biți; un rest mai scurt devine ultimul octet
+    """
+    binary_str = _as_bytes(binary_str)
+    # Grupurile complete de 8 biți se convertesc dintr-o dată, ca un singur int
+    full = len(binary_str) - len(binary_str) % 8
+    result = int(binary_str[:full], 2).to_bytes(full // 8, 'big') if full else b''
+    if full < len(binary_str):
+        result += bytes([int(binary_str[full:], 2)])
+    return result
+
+
+def bytes_to_binary(data):
+    """
+    Convertește bytes în string binar
+    Args:
+        data: b'Hello' (sau memoryview / bytearray)
+    Returns:
+        '0100100001100101011011000110110001101111'
+    """
+    if len(data) <= _TABLE_MAX_BYTES:
+        return ''.join(map(_BYTE_BITS.__getitem__, data))
+    return format(int.from_bytes(data, 'big'), f'0{len(data) * 8}b')
+
+
+# === CONVERSII ÎN FLUX (STREAMING) ===
+# Generatoarele primesc bucăți (bytes / memoryview) și produc bucăți de ieșire,
+# păstrând între bucăți restul care nu se poate converti încă, așa că memoria
+# folosită nu depinde de mărimea intrării.
+
+def iter_chunks(data, chunk_size=1 << 20):
+    """
+    Împarte un buffer în memoryview-uri de câte chunk_size octeți (fără copii);
+    un buffer care încape într-o bucată e dat mai departe ca atare
+    """
+    if len(data) <= chunk_size:
+        if len(data):
+            yield data
+        return
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        yield view[start:start + chunk_size]
+
+
+def iter_file(f, chunk_size=1 << 20):
+    """Citește un fișier binar în bucăți de chunk_size octeți"""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def stream_bytes_to_binary(chunks):
+    """bytes -> cifre binare ASCII (b'0100...'), bucată cu bucată"""
+    for chunk in chunks:
+        if len(chunk) > _TABLE_MAX_BYTES:
+            yield bytes_to_binary(chunk).encode()
+        elif len(chunk):
+            # Bucățile mici ies direct din tabelul ASCII, fără str intermediar
+            yield b''.join(map(_BYTE_BITS_ASCII.__getitem__, chunk))
+
+
+def stream_binary_to_bytes(chunks):
+    """Cifre binare ASCII -> bytes; restul de sub 8 biți se convertește la final"""
+    carry = b''
+    for chunk in chunks:
+        data = carry + _as_bytes(chunk)
+        full = len(data) - len(data) % 8
+        carry = data[full:]
+        if full:
+            yield binary_to_bytes(data[:full])
+    if carry:
+        yield binary_to_bytes(carry)
+
+
+def stream_hex_to_bytes(chunks):
+    """Hex ASCII -> bytes (prin binascii); o cifră rămasă fără pereche dă binascii.Error"""
+    carry = b''
+    for chunk in chunks:
+        data = carry + _as_bytes(chunk)
+        even = len(data) - len(data) % 2
+        carry = data[even:]
+        if even:
+            yield binascii.unhexlify(data[:even])
+    if carry:
+        raise binascii.Error("Odd-length string")
+
+
+def _strip_whitespace(data):
+    if (len(data) < _WHITESPACE_SCAN_MIN_BYTES
+            or b'\n' in data or b'\r' in data or b' ' in data or b'\t' in data):
+        return data.translate(None, _BASE64_WHITESPACE)
+    return data
+
+
+def stream_base64_decode(chunks):
+    """Base64 ASCII (cu sau fără linii noi) -> bytes, în grupuri complete de 4 caractere"""
+    carry = b''
+    for chunk in chunks:
+        data = _strip_whitespace(_as_bytes(chunk))
+        if carry:
+            data = carry + data
+        whole = len(data) - len(data) % 4
+        if whole == len(data):
+            # Bucată fără rest (cazul obișnuit): fără concatenări și felii
+            carry = b''
+            if whole:
+                yield binascii.a2b_base64(data)
+            continue
+        carry = data[whole:]
+        if whole:
+            yield binascii.a2b_base64(data[:whole])
+    if carry:
+        yield binascii.a2b_base64(carry)
+
+
+def convert_file(converter, src, dst, chunk_size=1 << 20):
+    """
+    Aplică o conversie în flux între două fișiere binare deschise
+    Args:
+        converter: unul dintre stream_* (ex: stream_hex_to_bytes)
+    Returns:
+        numărul de octeți scriși
+    """
+    written = 0
+    for out in converter(iter_file(src, chunk_size)):
+        dst.write(out)
+        written += len(out)
+    return written
+
+
+# === OPERAȚII LOGICE ÎN LOT (BATCH) ===
+
+# Funcțiile primesc operanzii deja convertiți (array-uri NumPy sau int-uri mari);
+# rezultatul este mascat la bit_width de batch_binary_logic.
+BATCH_OPERATIONS = {
+    'and': lambda a, b: a & b,
+    'or': lambda a, b: a | b,
+    'xor': lambda a, b: a ^ b,
+    'nand': lambda a, b: ~(a & b),
+    'nor': lambda a, b: ~(a | b),
+    'not': lambda a: ~a,
+    'complex': lambda a, b, c: (a & b) ^ c,
+}
+
+# Aceleași operații pe BitVector, pentru binary_* cu operanzi mai lați de 8 biți
+_VECTOR_OPERATIONS = {
+    'and': BitVector.__and__,
+    'or': BitVector.__or__,
+    'xor': BitVector.__xor__,
+    'nand': BitVector.nand,
+    'nor': BitVector.nor,
+    'not': BitVector.__invert__,
+    'complex': lambda x, y, z: (x & y) ^ z,
+}
+
+
+def pack_operands(values, bit_width=8):
+    """
+    Împachetează o listă de int-uri în bytes, câte (bit_width + 7) // 8 octeți
+    big-endian per valoare
+    Args:
+        values: [213, 7, ...]
+    Returns:
+        bytes
+    """
+    width = (bit_width + 7) // 8
+    mask = (1 << bit_width) - 1
+    return b''.join((value & mask).to_bytes(width, 'big') for value in values)
+
+
+def unpack_operands(data, bit_width=8):
+    """
+    Inversul lui pack_operands
+    Returns:
+        listă de int-uri
+    """
+    width = (bit_width + 7) // 8
+    view = memoryview(data)
+    return [int.from_bytes(view[i:i + width], 'big') for i in range(0, len(view), width)]
+
+
+def _packed_mask(count, bit_width):
+    """Masca pentru `count` valori împachetate: biții de peste bit_width din fiecare valoare sunt 0"""
+    width = (bit_width + 7) // 8
+    element = ((1 << bit_width) - 1).to_bytes(width, 'big')
+    return int.from_bytes(element * count, 'big')
+
+
+def batch_binary_logic(operation, *operands, bit_width=8):
+    """
+    Aplică o operație logică pe loturi întregi de operanzi, fără un apel Python per pereche
+    Args:
+        operation: cheie din BATCH_OPERATIONS ('and', 'or', 'xor', 'nand', 'nor', 'not',
+                   'complex' = (a AND b) XOR c) sau o funcție pe operanzi,
+                   ex: lambda a, b, c: (a | b) & ~c. Pentru bytes împachetate și liste,
+                   funcția primește tot lotul ca un singur int mare, deci trebuie să
+                   folosească doar &, |, ^ și ~: adunarea, shiftările sau comparațiile
+                   amestecă biții valorilor vecine și dau rezultate greșite (doar
+                   array-urile NumPy aplică funcția element cu element)
+        operands: toți de același tip, unul dintre:
+                  - array-uri NumPy de întregi (bit_width <= 64, necesită NumPy)
+                  - bytes / bytearray / memoryview împachetate (vezi pack_operands), orice bit_width
+                  - liste de int-uri, orice bit_width
+        bit_width: lățimea în biți; rezultatul este mascat la bit_width
+    Returns:
+        același tip ca operanzii (array uint64, bytes sau listă de int-uri)
+    """
+    func = BATCH_OPERATIONS[operation] if isinstance(operation, str) else operation
+    first = operands[0]
+
+    if np is not None and isinstance(first, np.ndarray):
+        if bit_width > 64:
+            raise ValueError("array-urile NumPy suportă cel mult 64 de biți; folosește bytes împachetate")
+        arrays = [np.asarray(op, dtype=np.uint64) for op in operands]
+        return func(*arrays) & np.uint64((1 << bit_width) - 1)
+
+    if isinstance(first, (list, tuple)):
+        packed = [pack_operands(op, bit_width) for op in operands]
+        return unpack_operands(batch_binary_logic(func, *packed, bit_width=bit_width), bit_width)
+
+    # Bytes împachetate: tot lotul devine un singur int mare, iar operațiile
+    # pe biți se aplică tuturor valorilor deodată; masca repetată taie biții
+    # de peste bit_width (inclusiv cei setați de NOT).
+    size = len(memoryview(first))
+    width = (bit_width + 7) // 8
+    if size % width or any(len(memoryview(op)) != size for op in operands):
+        raise ValueError("operanzii împachetați trebuie să aibă aceeași lungime, multiplu de (bit_width + 7) // 8")
+    values = [int.from_bytes(op, 'big') for op in operands]
+    result = func(*values) & _packed_mask(size // width, bit_width)
+    return result.to_bytes(size, 'big')
@@ -0,0 +1,79 @@
+# utils/framing.py
+
+
+class LineTooLongError(ValueError):
+    """A line grew past LineFramer.max_line without its newline arriving"""
+
+
+class LineFramer:
+    """
+    Incremental newline framer over one reusable bytearray.
+
+    Receive straight into it with sock.recv_into(framer.get_buffer()) (or
+    loop.sock_recv_into), report the byte count with advance(n), then iterate
+    lines() to get the complete lines received so far. Every byte is scanned
+    once, and a line split across TCP segments is only handed out once its
+    newline has arrived.
+
+    lines() yields memoryview slices of the internal buffer, without the
+    trailing '\\n' / '\\r\\n'. They stay valid until the next get_buffer()
+    or feed() call; copy them with bytes() to keep them longer.
+    """
+
+    def __init__(self, size=65536, max_line=1 << 20):
+        self._buf = bytearray(size)
+        self._view = memoryview(self._buf)
+        self._start = 0  # first byte not handed out yet
+        self._scan = 0   # first byte not searched for '\n' yet
+        self._end = 0    # end of received data
+        self.max_line = max_line
+
+    def get_buffer(self, min_free=4096):
+        """
+        Returns a writable memoryview over the free tail of the buffer,
+        compacting or growing the buffer first if less than min_free bytes are free.
+        """
+        if len(self._buf) - self._end < min_free:
+            pending = self._end - self._start
+            if pending > self.max_line:
+                raise LineTooLongError("line longer than max_line")
+            if self._start and len(self._buf) - pending >= min_free:
+                # Slide the unfinished line to the front (copied, the ranges may overlap)
+                self._buf[:pending] = self._view[self._start:self._end].tobytes()
+            else:
+                # A new array, so views handed out earlier are not resized under their owner
+                grown = bytearray(max(len(self._buf) * 2, pending + min_free))
+                grown[:pending] = self._view[self._start:self._end]
+                self._buf = grown
+                self._view = memoryview(grown)
+            self._scan -= self._start
+            self._start = 0
+            self._end = pending
+        return self._view[self._end:]
+
+    def advance(self, nbytes):
+        """Marks nbytes written into the last get_buffer() view as received"""
+        self._end += nbytes
+
+    def feed(self, data):
+        """Copies data in, for sources that cannot receive into a buffer"""
+        view = self.get_buffer(len(data))
+        view[:len(data)] = data
+        self.advance(len(data))
+
+    def lines(self):
+        """Yields every complete line received since the last call"""
+        buf = self._buf
+        while True:
+            newline = buf.find(b'\n', self._scan, self._end)
+            if newline < 0:
+                self._scan = self._end
+                return
+            start = self._start
+            end = newline - 1 if newline > start and buf[newline - 1] == 13 else newline  # 13 = '\r'
+            self._start = self._scan = newline + 1
+            yield self._view[start:end]
+
+    def pending(self):
+        """Returns the bytes of the unfinished last line"""
+        return bytes(self._view[self._start:self._end])
@@ -0,0 +1,201 @@
+# utils/log.py
+import logging
+import os
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+# Every logger lives under this name; the event type is the last part of the
+# logger name, e.g. "ctf.server.sent" logs events of type "sent".
+ROOT = "ctf"
+
+# --log-level choices; "silent" drops everything before a record is even created
+LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "silent": logging.CRITICAL + 1,
+}
+
+
+# Writer thread of the current setup_logging() call, restarted in forked children
+_listener = None
+# Whether _listener is started and not stopped yet (QueueListener does not say)
+_running = False
+# Process the writer thread runs in; a forked child starts its own on its first record
+_owner = None
+_restart_lock = threading.Lock()
+
+
+def get_logger(component, event):
+    """
+    Args:
+        component: 'server' or 'client'
+        event: event type, the key sampling rates are looked up by
+    Returns:
+        logging.Logger named ctf.<component>.<event>
+    """
+    return logging.getLogger(f"{ROOT}.{component}.{event}")
+
+
+class Text:
+    """
+    Log argument that decodes bytes only when the record is formatted, i.e. in the
+    writer thread and only for records that pass the level and sampling checks.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return self.data.decode(errors='ignore').strip()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a fixed share of the records of each event type.
+    Sampling is deterministic: with rate 0.25 every 4th record passes.
+    Records at WARNING and above are never dropped.
+    """
+
+    def __init__(self, rates):
+        """
+        Args:
+            rates: {event: share of records to keep, 0.0 - 1.0}; missing events keep everything
+        """
+        super().__init__()
+        self.rates = dict(rates)
+        self._credit = dict.fromkeys(self.rates, 0.0)
+
+    def filter(self, record):
+        event = record.name.rpartition(".")[2]
+        rate = self.rates.get(event)
+        if rate is None or rate >= 1.0 or record.levelno >= logging.WARNING:
+            return True
+        # Unlocked on purpose: a race between threads only shifts which record is kept
+        credit = self._credit[event] + rate
+        if credit >= 1.0:
+            self._credit[event] = credit - 1.0
+            return True
+        self._credit[event] = credit
+        return False
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves message formatting to the listener thread.
+    The stock handler formats in the calling thread; here the record goes on the
+    queue as-is, which is safe because the arguments we log are immutable.
+    In a forked child the first record starts the child's writer thread, so
+    children that never log (solver pool workers) never run one.
+    """
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        if _owner != os.getpid():
+            _restart_in_child()
+        self.queue.put_nowait(record)
+
+
+def parse_sample_rates(specs):
+    """
+    Args:
+        specs: iterable of 'event=rate' strings, e.g. ['sent=0.01', 'received=0.01']
+    Returns:
+        {event: rate}
+    Raises:
+        ValueError for a malformed spec or a rate outside 0 - 1
+    """
+    rates = {}
+    for spec in specs or ():
+        event, sep, rate = spec.partition("=")
+        if not sep or not event:
+            raise ValueError(f"expected event=rate, got {spec!r}")
+        rates[event] = float(rate)
+        if not 0.0 <= rates[event] <= 1.0:
+            raise ValueError(f"sample rate for {event} must be between 0 and 1")
+    return rates
+
+
+def setup_logging(level="info", sample_rates=None, stream=None):
+    """
+    Routes the ctf loggers through a queue drained by a background writer thread,
+    so the threads that log never wait on the output stream or its lock.
+    Args:
+        level: key of LEVELS
+        sample_rates: {event: share of records to keep}
+        stream: where the writer thread prints (default sys.stdout)
+    Returns:
+        started QueueListener, or None in silent mode; call stop_logging() before exiting
+    """
+    global _listener, _running, _owner
+    stop_logging(_listener)
+    root = logging.getLogger(ROOT)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(LEVELS[level])
+    root.propagate = False
+    if level == "silent":
+        root.addHandler(logging.NullHandler())
+        return None
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(logging.Formatter("%(message)s"))
+    records = queue.SimpleQueue()
+    handler = _DeferredQueueHandler(records)
+    if sample_rates:
+        handler.addFilter(SamplingFilter(sample_rates))
+    root.addHandler(handler)
+    _listener = QueueListener(records, output)
+    _listener.start()
+    _running = True
+    _owner = os.getpid()
+    return _listener
+
+
+def stop_logging(listener=None):
+    """
+    Flushes the queued records and stops a writer thread started by setup_logging
+    Args:
+        listener: what setup_logging returned (default: the current writer thread)
+    """
+    global _listener, _running
+    if listener is not None and listener is not _listener:
+        return  # replaced by a later setup_logging() call, which already stopped it
+    if _running and _owner == os.getpid():
+        _listener.stop()
+    # A forked child that never logged has no writer thread and nothing to flush
+    _listener = None
+    _running = False
+
+
+def _restart_in_child():
+    """fork() copies the queue but not the writer thread: give the child its own of both"""
+    global _listener, _owner
+    with _restart_lock:
+        if _owner == os.getpid() or not _running:
+            return
+        # Records still queued in the copy belong to the parent, which writes them itself
+        records = queue.SimpleQueue()
+        for handler in logging.getLogger(ROOT).handlers:
+            if isinstance(handler, QueueHandler):
+                handler.queue = records
+        _listener = QueueListener(records, *_listener.handlers)
+        _listener.start()
+        _owner = os.getpid()
+
+
+def _reset_lock_after_fork():
+    """The child's copy of _restart_lock may have been held by a parent thread that is gone"""
+    global _restart_lock
+    _restart_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_lock_after_fork)
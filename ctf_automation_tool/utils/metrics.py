@@ -0,0 +1,115 @@
+# utils/metrics.py
+import asyncio
+import json
+import threading
+from bisect import bisect_left
+
+# Histogram bucket upper bounds in seconds (10us .. 10s, roughly x2.5 per step)
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Stages of the client receive/answer loop, in order
+CLIENT_STAGES = ("recv", "frame", "solve", "send")
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and two additions."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """Returns [(upper bound, cumulative count)], ending with ('+Inf', count)"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def to_dict(self):
+        return {"count": self.count, "sum": self.sum,
+                "buckets": {str(bound): count for bound, count in self.cumulative()}}
+
+
+class StageMetrics:
+    """
+    Per-stage, per-challenge-type latency histograms.
+    Label combinations are created on first use.
+    """
+
+    def __init__(self, name="ctf_client_stage_seconds", buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.buckets = buckets
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, challenge_type, seconds):
+        histogram = self.histograms.get((stage, challenge_type))
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault((stage, challenge_type), Histogram(self.buckets))
+        histogram.observe(seconds)
+
+    def to_json(self):
+        """
+        Returns:
+            {stage: {challenge_type: histogram dict}}
+        """
+        result = {}
+        for (stage, challenge_type), histogram in sorted(self.histograms.items()):
+            result.setdefault(stage, {})[challenge_type] = histogram.to_dict()
+        return result
+
+    def to_prometheus(self):
+        """
+        Returns:
+            the histograms in the Prometheus text exposition format
+        """
+        lines = [f"# HELP {self.name} Client loop time per stage and challenge type.",
+                 f"# TYPE {self.name} histogram"]
+        for (stage, challenge_type), histogram in sorted(self.histograms.items()):
+            labels = f'stage="{stage}",type="{challenge_type}"'
+            for bound, count in histogram.cumulative():
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"{self.name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{self.name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_json(), f, indent=2)
+
+
+async def serve_prometheus(metrics, host="127.0.0.1", port=9100):
+    """
+    Serves metrics.to_prometheus() over HTTP (any path) until cancelled
+    """
+    async def on_request(reader, writer):
+        try:
+            await reader.readuntil(b"\r\n\r\n")
+            body = metrics.to_prometheus().encode()
+            writer.write(b"HTTP/1.1 200 OK\r\n"
+                         b"Content-Type: text/plain; version=0.0.4\r\n"
+                         + f"Content-Length: {len(body)}\r\n".encode()
+                         + b"Connection: close\r\n\r\n" + body)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(on_request, host, port)
+    async with server:
+        await server.serve_forever()
@@ -0,0 +1,132 @@
+# utils/offload.py
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils import solver
+from utils.cache import normalize_challenge
+from utils.parsers import classify_challenge
+
+# Challenge type -> offload settings. Types not listed are always solved inline.
+#   deadline:   seconds a pooled solve may take before the answer is given up as UNKNOWN
+#   min_length: lines shorter than this (bytes) are cheap enough to solve inline
+DEFAULT_ROUTES = {
+    "math": {"deadline": 2.0, "min_length": 256},
+    "sequence": {"deadline": 2.0, "min_length": 256},
+    "base64": {"deadline": 2.0, "min_length": 4096},
+}
+
+
+def load_routes(path):
+    """
+    Reads offload routes from a JSON file shaped like DEFAULT_ROUTES;
+    missing settings of a type fall back to deadline 2.0 and min_length 0
+    """
+    with open(path) as f:
+        routes = json.load(f)
+    return {challenge_type: {"deadline": float(route.get("deadline", 2.0)),
+                             "min_length": int(route.get("min_length", 0))}
+            for challenge_type, route in routes.items()}
+
+
+def _report_pid(pids):
+    """Worker initializer: tells the pool which process to kill when it is recycled"""
+    pids.put(os.getpid())
+
+
+class SolverPool:
+    """
+    Solves challenge lines for an event loop, sending expensive ones to worker processes.
+
+    A line goes to the pool when its type has a route and it is at least the
+    route's min_length long; everything else (8-bit logic, short questions) is
+    solved inline, so cheap challenges never wait behind an expensive one.
+    Pooled solves run under the route's deadline and answer "UNKNOWN" when it
+    passes; the workers are then killed and replaced, so a runaway solve does not
+    keep a process busy. Answers are cached in utils.solver.CACHE either way.
+    """
+
+    def __init__(self, routes=DEFAULT_ROUTES, workers=None):
+        self.routes = routes
+        self.workers = workers
+        self.executor, self._pids = self._start()
+        self.stats = {"inline": 0, "offloaded": 0, "timeouts": 0, "recycled": 0}
+        # Lines shorter than every min_length skip classification here
+        self._shortest = min((route["min_length"] for route in routes.values()), default=float("inf"))
+
+    def _start(self):
+        pids = multiprocessing.SimpleQueue()
+        return ProcessPoolExecutor(self.workers, initializer=_report_pid, initargs=(pids,)), pids
+
+    def _retire(self, executor, pids):
+        """Shuts an executor down without waiting and kills the workers it started"""
+        executor.shutdown(wait=False, cancel_futures=True)
+        while not pids.empty():
+            try:
+                os.kill(pids.get(), getattr(signal, "SIGKILL", signal.SIGTERM))
+            except OSError:
+                pass  # already gone
+
+    def _recycle(self, executor):
+        # Several solves may time out on the same executor; only the first replaces it
+        if executor is not self.executor:
+            return
+        retired = self.executor, self._pids
+        self.executor, self._pids = self._start()
+        self.stats["recycled"] += 1
+        self._retire(*retired)
+
+    async def _run(self, key, deadline):
+        loop = asyncio.get_running_loop()
+        end = loop.time() + deadline
+        while True:
+            executor = self.executor
+            future = loop.run_in_executor(executor, solver.solve_line, key)
+            try:
+                return await asyncio.wait_for(future, max(end - loop.time(), 0))
+            except asyncio.TimeoutError:
+                self._recycle(executor)
+                raise
+            except BrokenProcessPool:
+                if executor is self.executor:
+                    raise
+                # Killed by another solve's recycle: try again on the new workers
+
+    async def solve(self, line, classified=None):
+        """
+        Args:
+            line: challenge line as bytes or memoryview
+            classified: classify_challenge(line), if the caller already has it;
+                        it is then passed on to an inline solve instead of parsing the line again
+        Returns:
+            tuple (challenge_type, answer), like utils.solver.solve_frame
+        """
+        if classified is None and len(line) >= self._shortest:
+            classified = classify_challenge(line)
+        route = self.routes.get(classified[0]) if classified is not None else None
+        if route is None or len(line) < route["min_length"]:
+            self.stats["inline"] += 1
+            return solver.solve_frame(line, classified)
+
+        key = normalize_challenge(line)
+        cached = solver.CACHE.get(key)
+        if cached is not None:
+            return cached[0], cached[1]
+
+        self.stats["offloaded"] += 1
+        try:
+            challenge_type, answer = await self._run(key, route["deadline"])
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            return classified[0], "UNKNOWN"
+        if answer != "UNKNOWN":
+            solver.CACHE.put(key, (challenge_type, answer))
+        return challenge_type, answer
+
+    def close(self):
+        # Solves still running past their deadline are not waited for
+        self._retire(self.executor, self._pids)
@@ -1,143 +1,248 @@
-# utils/parsers.py
-import re
-
-def extract_hex(text):
-    """Extracts hex value from text"""
-    match = re.search(r'(0x)?([0-9a-fA-F]+)', text)
-    return match.group(2) if match else None
-
-def extract_numbers(text):
-    """Extracts all numbers from text"""
-    return [int(n) for n in re.findall(r'\d+', text)]
-
-def extract_word_after_keyword(text, keyword):
-    """Extracts the word after a keyword (e.g., 'Reverse: hello')"""
-    match = re.search(rf'{keyword}[:\s]+(\w+)', text, re.I)
-    return match.group(1) if match else None
-
-def extract_base64(text):
-    """Extracts base64 string from text"""
-    match = re.search(r'([A-Za-z0-9+/=]{4,})', text)
-    return match.group(1) if match else None
-
-def extract_math_expression(text):
-    """Extracts mathematical expression"""
-    match = re.search(r'What is (.+)\?', text)
-    return match.group(1) if match else None
-
-# === EXTRACTORS FOR BINARY LOGIC OPERATIONS ===
-
-def extract_binary_operation(text, operation):
-    """
-    Extracts binary operands for logic operations
-    Args:
-        text: the challenge text
-        operation: 'AND', 'OR', 'XOR', 'NOR', 'NAND'
-    Returns:
-        tuple (a, b) containing the binary numbers or None
-    """
-    pattern = rf'Binary {operation}.*?:\s*(\d+)\s+{operation}\s+(\d+)'
-    match = re.search(pattern, text, re.I)
-    if match:
-        return (match.group(1), match.group(2))
-    return None
-
-def extract_binary_and(text):
-    """Extracts operands for Binary AND"""
-    return extract_binary_operation(text, 'AND')
-
-def extract_binary_or(text):
-    """Extracts operands for Binary OR"""
-    return extract_binary_operation(text, 'OR')
-
-def extract_binary_xor(text):
-    """Extracts operands for Binary XOR"""
-    return extract_binary_operation(text, 'XOR')
-
-def extract_binary_nor(text):
-    """Extracts operands for Binary NOR"""
-    return extract_binary_operation(text, 'NOR')
-
-def extract_binary_nand(text):
-    """Extracts operands for Binary NAND"""
-    return extract_binary_operation(text, 'NAND')
-
-def extract_binary_not(text):
-    """Extracts operand for Binary NOT"""
-    match = re.search(r'NOT\s+(\d+)', text)
-    return match.group(1) if match else None
-
-def extract_complex_logic(text):
-    """
-    Extracts operands from complex expressions
-    Example: "(1010 AND 1100) XOR 1111"
-    Returns:
-        tuple (a, b, c) or None
-    """
-    match = re.search(r'\((\d+)\s+AND\s+(\d+)\)\s+XOR\s+(\d+)', text)
-    if match:
-        return (match.group(1), match.group(2), match.group(3))
-    return None
-
-def binary_to_int(binary_str):
-    """
-    Converts binary string to int
-    Args:
-        binary_str: string with binary number (without 0b)
-    Returns:
-        int or None
-    """
-    try:
-        return int(binary_str, 2)
-    except (ValueError, TypeError):
-        return None
-
-def int_to_binary(num):
-    """
-    Converts int to binary string (without 0b)
-    Args:
-        num: integer
-    Returns:
-        binary string without 0b prefix
-    """
-    return bin(num)[2:]
-
-def is_binary_challenge(text):
-    """Checks if the challenge is a binary operation"""
-    binary_keywords = ['Binary AND', 'Binary OR', 'Binary XOR',
-                       'Binary NOR', 'Binary NAND', 'Binary NOT',
-                       'Calculate:']
-    return any(keyword in text for keyword in binary_keywords)
-
-def get_challenge_type(text):
-    """
-    Detects the challenge type from text
-    Returns:
-        string containing the challenge type
-    """
-    if "Binary AND" in text:
-        return "binary_and"
-    elif "Binary OR" in text:
-        return "binary_or"
-    elif "Binary XOR" in text:
-        return "binary_xor"
-    elif "Binary NOR" in text:
-        return "binary_nor"
-    elif "Binary NAND" in text:
-        return "binary_nand"
-    elif "Binary NOT" in text:
-        return "binary_not"
-    elif "Calculate:" in text and "AND" in text and "XOR" in text:
-        return "complex_logic"
-    elif "Reverse" in text:
-        return "reverse"
-    elif "hex to decimal" in text:
-        return "hex_to_decimal"
-    elif "base64" in text:
-        return "base64"
-    elif "What is" in text:
-        return "math"
-    elif "sequence" in text:
-        return "sequence"
-    else:
-        return "unknown"
\ No newline at end of file
+# utils/parsers.py
+import os
+import re
+
+def extract_hex(text):
+    """Extracts hex value from text"""
+    match = re.search(r'(0x)?([0-9a-fA-F]+)', text)
+    return match.group(2) if match else None
+
+def extract_numbers(text):
+    """Extracts all numbers from text"""
+    return [int(n) for n in re.findall(r'\d+', text)]
+
+def extract_word_after_keyword(text, keyword):
+    """Extracts the word after a keyword (e.g., 'Reverse: hello')"""
+    match = re.search(rf'{keyword}[:\s]+(\w+)', text, re.I)
+    return match.group(1) if match else None
+
+def extract_base64(text):
+    """Extracts base64 string from text"""
+    match = re.search(r'([A-Za-z0-9+/=]{4,})', text)
+    return match.group(1) if match else None
+
+def extract_math_expression(text):
+    """Extracts mathematical expression"""
+    match = re.search(r'What is (.+)\?', text)
+    return match.group(1) if match else None
+
+# === EXTRACTORS FOR BINARY LOGIC OPERATIONS ===
+
+def extract_binary_operation(text, operation):
+    """
+    Extracts binary operands for logic operations
+    Args:
+        text: the challenge text
+        operation: 'AND', 'OR', 'XOR', 'NOR', 'NAND'
+    Returns:
+        tuple (a, b) containing the binary numbers or None
+    """
+    pattern = rf'Binary {operation}.*?:\s*(\d+)\s+{operation}\s+(\d+)'
+    match = re.search(pattern, text, re.I)
+    if match:
+        return (match.group(1), match.group(2))
+    return None
+
+def extract_binary_and(text):
+    """Extracts operands for Binary AND"""
+    return extract_binary_operation(text, 'AND')
+
+def extract_binary_or(text):
+    """Extracts operands for Binary OR"""
+    return extract_binary_operation(text, 'OR')
+
+def extract_binary_xor(text):
+    """Extracts operands for Binary XOR"""
+    return extract_binary_operation(text, 'XOR')
+
+def extract_binary_nor(text):
+    """Extracts operands for Binary NOR"""
+    return extract_binary_operation(text, 'NOR')
+
+def extract_binary_nand(text):
+    """Extracts operands for Binary NAND"""
+    return extract_binary_operation(text, 'NAND')
+
+def extract_binary_not(text):
+    """Extracts operand for Binary NOT"""
+    match = re.search(r'NOT\s+(\d+)', text)
+    return match.group(1) if match else None
+
+def extract_complex_logic(text):
+    """
+    Extracts operands from complex expressions
+    Example: "(1010 AND 1100) XOR 1111"
+    Returns:
+        tuple (a, b, c) or None
+    """
+    match = re.search(r'\((\d+)\s+AND\s+(\d+)\)\s+XOR\s+(\d+)', text)
+    if match:
+        return (match.group(1), match.group(2), match.group(3))
+    return None
+
+def binary_to_int(binary_str):
+    """
+    Converts binary string to int
+    Args:
+        binary_str: string with binary number (without 0b)
+    Returns:
+        int or None
+    """
+    try:
+        return int(binary_str, 2)
+    except (ValueError, TypeError):
+        return None
+
+def int_to_binary(num):
+    """
+    Converts int to binary string (without 0b)
+    Args:
+        num: integer
+    Returns:
+        binary string without 0b prefix
+    """
+    return bin(num)[2:]
+
+def is_binary_challenge(text):
+    """Checks if the challenge is a binary operation"""
+    binary_keywords = ['Binary AND', 'Binary OR', 'Binary XOR',
+                       'Binary NOR', 'Binary NAND', 'Binary NOT',
+                       'Calculate:']
+    return any(keyword in text for keyword in binary_keywords)
+
+# === KEYWORD CHALLENGE DISPATCH ===
+
+# One entry per challenge type: (type, lead, keyword, pattern)
+#   lead:    how the question starts. A line is dispatched on its lead (right after
+#            any "[Challenge i/N] " prefix) to the pattern of that one type, which
+#            is matched - not searched - there, so adding a type does not slow the others.
+#   keyword: text the pattern can also match from, for lines that do not start
+#            with a known question (e.g. "3 + 4 What is 5*5?"); only types whose
+#            keyword is in such a line are tried, and the leftmost match wins
+#   pattern: regex for the question, starting with the lead; its groups are the operands
+CHALLENGE_PATTERNS = [
+    ("binary_and", "Binary AND:", "Binary AND", r'Binary AND:\s*(\d+)\s+AND\s+(\d+)'),
+    ("binary_or", "Binary OR:", "Binary OR", r'Binary OR:\s*(\d+)\s+OR\s+(\d+)'),
+    ("binary_xor", "Binary XOR:", "Binary XOR", r'Binary XOR:\s*(\d+)\s+XOR\s+(\d+)'),
+    # NOR/NAND/NOT capture the declared width of "(8-bit)" first (None if absent)
+    ("binary_nor", "Binary NOR", "Binary NOR", r'Binary NOR(?:\s*\((\d+)-bit\))?[^:]*:\s*(\d+)\s+NOR\s+(\d+)'),
+    ("binary_nand", "Binary NAND", "Binary NAND", r'Binary NAND(?:\s*\((\d+)-bit\))?[^:]*:\s*(\d+)\s+NAND\s+(\d+)'),
+    ("binary_not", "Binary NOT", "Binary NOT", r'Binary NOT(?:\s*\((\d+)-bit\))?[^:]*:\s*NOT\s+(\d+)'),
+    ("complex_logic", "Calculate:", "Calculate:", r'Calculate:\s*\((\d+)\s+AND\s+(\d+)\)\s+XOR\s+(\d+)'),
+    ("reverse", "Reverse", "Reverse this string:", r'Reverse this string:\s*(\w+)'),
+    ("hex_to_decimal", "Convert", "hex to decimal:", r'(?:Convert )?hex to decimal:\s*0x([0-9a-fA-F]+)'),
+    ("base64", "Decode", "base64:", r'(?:Decode this )?base64:\s*([A-Za-z0-9+/=]+)'),
+    ("math", "What is", "What is", r'What is (.+)\?'),
+    ("sequence", "Next", "sequence", r'(?:Next number in )?sequence[^:]*:\s*([-\d,\s]+?),?\s*\?'),
+]
+
+# Leads are looked up by their first LEAD_KEY characters; leads that share those
+# (the binary operations) are told apart by the characters where they first differ
+LEAD_KEY = 4
+
+# Prefix of the lines the server sends, skipped before dispatching
+CHALLENGE_PREFIX = "[Challenge "
+
+# Bare "a + b" is only a last resort, tried when no pattern above matches anywhere
+# in the line (it would otherwise win over a challenge to its right)
+ADDITION_PATTERN = r'(\d+)\s*\+\s*(\d+)'
+_ADDITION_REGEX = re.compile(ADDITION_PATTERN)
+
+def _compile_dispatch(patterns):
+    """
+    Builds the lead and keyword tables
+    Returns:
+        tuple ({lead[:LEAD_KEY]: (offset, size, {lead[offset:offset + size]: (type, regex)})},
+               [(keyword, type, regex)])
+    Raises:
+        ValueError if two leads cannot be told apart
+    """
+    groups = {}
+    by_keyword = []
+    for challenge_type, lead, keyword, pattern in patterns:
+        regex = re.compile(pattern)
+        groups.setdefault(lead[:LEAD_KEY], []).append((lead, challenge_type, regex))
+        by_keyword.append((keyword, challenge_type, regex))
+    by_lead = {}
+    for key, members in groups.items():
+        leads = [lead for lead, _, _ in members]
+        offset = size = 0
+        if len(members) > 1:
+            offset = len(os.path.commonprefix(leads))
+            size = min(len(lead) for lead in leads) - offset
+        table = {lead[offset:offset + size]: (challenge_type, regex) for lead, challenge_type, regex in members}
+        if len(table) != len(members):
+            raise ValueError(f"challenge leads starting with {key!r} are ambiguous: {leads}")
+        by_lead[key] = (offset, size, table)
+    return by_lead, by_keyword
+
+_BY_LEAD, _BY_KEYWORD = _compile_dispatch(CHALLENGE_PATTERNS)
+
+def classify_challenge(text):
+    """
+    Classifies a challenge line and extracts its operands
+    Args:
+        text: the challenge text (e.g., 'Binary AND: 1010 AND 1100 = ?'), either
+              str or raw bytes/memoryview (decoded as UTF-8, invalid bytes dropped)
+    Returns:
+        tuple (challenge_type, operands) where operands is a tuple of strings
+        (None for an optional operand that is absent), or ("unknown", ()) if
+        no known challenge matches
+    """
+    if not isinstance(text, str):
+        text = str(text, 'utf-8', 'ignore')
+    start = text.find('] ') + 2 if text.startswith(CHALLENGE_PREFIX) else 0
+    lead = _BY_LEAD.get(text[start:start + LEAD_KEY])
+    if lead:
+        offset, size, table = lead
+        found = table.get(text[start + offset:start + offset + size])
+        if found:
+            match = found[1].match(text, start)
+            if match:
+                return found[0], match.groups()
+
+    # Not a question we know at the start of the line: look for one further in
+    best = None
+    for keyword, challenge_type, regex in _BY_KEYWORD:
+        if keyword not in text:
+            continue
+        position = text.find(keyword)
+        while position >= 0 and (best is None or position < best[1].start()):
+            match = regex.match(text, position)
+            if match:
+                best = challenge_type, match
+                break
+            position = text.find(keyword, position + 1)
+    if best:
+        return best[0], best[1].groups()
+    match = _ADDITION_REGEX.search(text) if '+' in text else None
+    return ("addition", match.groups()) if match else ("unknown", ())
+
+# Keyword checks of the original get_challenge_type, in its order, for text that
+# names a challenge without the operands classify_challenge needs
+_TYPE_KEYWORDS = [
+    (("Binary AND",), "binary_and"),
+    (("Binary OR",), "binary_or"),
+    (("Binary XOR",), "binary_xor"),
+    (("Binary NOR",), "binary_nor"),
+    (("Binary NAND",), "binary_nand"),
+    (("Binary NOT",), "binary_not"),
+    (("Calculate:", "AND", "XOR"), "complex_logic"),
+    (("Reverse",), "reverse"),
+    (("hex to decimal",), "hex_to_decimal"),
+    (("base64",), "base64"),
+    (("What is",), "math"),
+    (("sequence",), "sequence"),
+]
+
+def get_challenge_type(text):
+    """
+    Detects the challenge type from text
+    Returns:
+        string containing the challenge type; keywords alone are enough, and
+        bare "a + b" text is "unknown" (classify_challenge calls it "addition")
+    """
+    challenge_type = classify_challenge(text)[0]
+    if challenge_type not in ("unknown", "addition"):
+        return challenge_type
+    return next((found for keywords, found in _TYPE_KEYWORDS if all(k in text for k in keywords)), "unknown")
@@ -0,0 +1,124 @@
+# utils/sequences.py
+from fractions import Fraction
+from functools import lru_cache
+from math import lcm
+
+# Highest polynomial degree tried by the finite-difference detector
+MAX_DEGREE = 6
+# Highest order tried by the linear recurrence detector
+MAX_ORDER = 3
+
+# === DETECTORS ===
+# Each detector takes a tuple of ints and returns the next term, or None if the
+# sequence does not follow its rule. All of them are a single pass (or a fixed
+# number of passes) over the terms and stop at the first term that breaks the rule.
+
+def arithmetic(nums):
+    """2, 5, 8, 11 -> 14"""
+    if len(nums) < 2:
+        return None
+    step = nums[1] - nums[0]
+    for i in range(2, len(nums)):
+        if nums[i] - nums[i - 1] != step:
+            return None
+    return nums[-1] + step
+
+def geometric(nums):
+    """3, 6, 12, 24 -> 48 ; 81, 27, 9 -> 3 (the next term must be an integer)"""
+    if len(nums) < 3 or nums[0] == 0:
+        return None
+    ratio = Fraction(nums[1], nums[0])
+    for i in range(2, len(nums)):
+        if nums[i] != nums[i - 1] * ratio:
+            return None
+    following = nums[-1] * ratio
+    return int(following) if following.denominator == 1 else None
+
+def polynomial(nums):
+    """1, 4, 9, 16, 25 -> 36 (finite differences until a row is constant)"""
+    rows = [nums]
+    row = nums
+    while len(rows) <= MAX_DEGREE and len(row) >= 3:
+        row = tuple(row[i + 1] - row[i] for i in range(len(row) - 1))
+        rows.append(row)
+        if len(row) >= 2 and all(value == row[0] for value in row):
+            # Extend every row by one term, from the constant row upwards
+            following = row[0]
+            for upper in reversed(rows[:-1]):
+                following = upper[-1] + following
+            return following
+    return None
+
+def sum_recurrence(nums):
+    """1, 1, 2, 3, 5, 8 -> 13 ; 0, 1, 1, 2, 4, 7 -> 13 (each term is the sum of the previous k)"""
+    for order in range(2, MAX_ORDER + 1):
+        if len(nums) < order + 2:
+            break
+        if all(nums[i] == sum(nums[i - order:i]) for i in range(order, len(nums))):
+            return sum(nums[-order:])
+    return None
+
+def _solve_linear(matrix, rhs):
+    """Solves a small square system exactly (Gaussian elimination over Fractions); None if singular"""
+    size = len(rhs)
+    rows = [[Fraction(v) for v in matrix[i]] + [Fraction(rhs[i])] for i in range(size)]
+    for col in range(size):
+        pivot = next((r for r in range(col, size) if rows[r][col] != 0), None)
+        if pivot is None:
+            return None
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(size):
+            if r != col and rows[r][col] != 0:
+                factor = rows[r][col] / rows[col][col]
+                rows[r] = [a - factor * b for a, b in zip(rows[r], rows[col])]
+    return [rows[i][size] / rows[i][i] for i in range(size)]
+
+def linear_recurrence(nums):
+    """1, 2, 5, 12, 29 -> 70 (a[n] = p*a[n-1] + q*a[n-2] + ..., up to MAX_ORDER terms)"""
+    for order in range(2, MAX_ORDER + 1):
+        # 2*order terms fix the coefficients, at least one more has to confirm them
+        if len(nums) < 2 * order + 1:
+            break
+        matrix = [nums[i:i + order] for i in range(order)]
+        coefficients = _solve_linear(matrix, nums[order:2 * order])
+        if coefficients is None:
+            continue
+        # Scale to integers so the check over the whole sequence avoids Fraction arithmetic
+        scale = lcm(*(c.denominator for c in coefficients))
+        weights = [int(c * scale) for c in coefficients]
+        if all(nums[i] * scale == sum(w * v for w, v in zip(weights, nums[i - order:i]))
+               for i in range(2 * order, len(nums))):
+            following, remainder = divmod(sum(w * v for w, v in zip(weights, nums[-order:])), scale)
+            if not remainder:
+                return following
+    return None
+
+def alternating(nums):
+    """1, 10, 2, 20, 3, 30 -> 4 (two interleaved sequences, each arithmetic or geometric)"""
+    if len(nums) < 4:
+        return None
+    lane = nums[len(nums) % 2::2]  # the interleaved sequence the next term belongs to
+    other = nums[1 - len(nums) % 2::2]
+    if arithmetic(other) is None and geometric(other) is None:
+        return None
+    following = arithmetic(lane)
+    return following if following is not None else geometric(lane)
+
+# Tried in order; the first detector that accepts the sequence gives the answer
+DETECTORS = (arithmetic, geometric, polynomial, sum_recurrence, linear_recurrence, alternating)
+
+@lru_cache(maxsize=4096)
+def next_term(nums):
+    """
+    Predicts the next term of an integer sequence. Results are cached by the
+    terms shown, so a sequence the service repeats is only analysed once.
+    Args:
+        nums: tuple of ints, e.g. (2, 4, 6, 8)
+    Returns:
+        int, or None if no detector recognises the sequence
+    """
+    for detector in DETECTORS:
+        following = detector(nums)
+        if following is not None:
+            return following
+    return None
@@ -0,0 +1,77 @@
+# utils/sessionlog.py
+import struct
+import time
+
+# Binary session log:
+#   header: MAGIC, then one record per chunk of bytes seen on the connection
+#   record: <delta_us: uint32><direction: uint8><length: uint32> followed by `length` payload bytes
+# delta_us is the time since the previous record (since recording started for the first one).
+MAGIC = b"CTFSLOG1"
+_RECORD = struct.Struct("<IBI")
+_MAX_DELTA_US = 0xFFFFFFFF
+
+# Record directions
+FROM_SERVER = 0
+FROM_CLIENT = 1
+
+
+class SessionRecorder:
+    """
+    Appends the timestamped byte stream of one session to a binary log.
+    Usable as a context manager; the file is closed on exit.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._last = time.perf_counter()
+
+    def record(self, direction, data):
+        """
+        Args:
+            direction: FROM_SERVER or FROM_CLIENT
+            data: bytes, bytearray or memoryview (copied into the log immediately)
+        """
+        now = time.perf_counter()
+        delta = min(int((now - self._last) * 1_000_000), _MAX_DELTA_US)
+        self._last = now
+        self._file.write(_RECORD.pack(delta, direction, len(data)))
+        self._file.write(data)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_session(path):
+    """
+    Reads a log written by SessionRecorder
+    Returns:
+        list of (seconds since the start of the recording, direction, payload bytes)
+    Raises:
+        ValueError if the file is not a session log or is truncated
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a session log")
+    view = memoryview(data)
+    position = len(MAGIC)
+    elapsed_us = 0
+    records = []
+    while position < len(view):
+        if position + _RECORD.size > len(view):
+            raise ValueError("truncated record header")
+        delta, direction, length = _RECORD.unpack_from(view, position)
+        position += _RECORD.size
+        if position + length > len(view):
+            raise ValueError("truncated record payload")
+        elapsed_us += delta
+        records.append((elapsed_us / 1_000_000, direction, bytes(view[position:position + length])))
+        position += length
+    return records
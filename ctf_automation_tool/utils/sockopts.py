@@ -0,0 +1,102 @@
+# utils/sockopts.py
+import socket
+
+# Socket settings shared by server.py and main.py. None leaves an option as the
+# OS (or asyncio, which already sets TCP_NODELAY on its TCP sockets) left it.
+# "baseline" is how sockets were set up before profiles existed (separate writes,
+# OS defaults); "low-latency" is what server.py and main.py use unless told otherwise.
+#   nodelay:   TCP_NODELAY, so small writes go out without waiting for the previous ACK (Nagle)
+#   coalesce:  send the messages of one turn (verdict + next challenge) in a single write
+#   keepalive: SO_KEEPALIVE, with keepidle/keepintvl/keepcnt where the platform has them
+#   rcvbuf / sndbuf: SO_RCVBUF / SO_SNDBUF in bytes
+SOCKET_PROFILES = {
+    "baseline": {
+        "nodelay": None, "coalesce": False, "keepalive": None,
+        "keepidle": None, "keepintvl": None, "keepcnt": None, "rcvbuf": None, "sndbuf": None,
+    },
+    "low-latency": {
+        "nodelay": True, "coalesce": True, "keepalive": True,
+        "keepidle": 60, "keepintvl": 10, "keepcnt": 5, "rcvbuf": None, "sndbuf": None,
+    },
+}
+
+DEFAULT_PROFILE = "low-latency"
+
+# profile key -> (level, option) for the plain on/off and integer options
+_OPTIONS = {
+    "nodelay": (socket.IPPROTO_TCP, socket.TCP_NODELAY),
+    "keepalive": (socket.SOL_SOCKET, socket.SO_KEEPALIVE),
+    "rcvbuf": (socket.SOL_SOCKET, socket.SO_RCVBUF),
+    "sndbuf": (socket.SOL_SOCKET, socket.SO_SNDBUF),
+}
+for _key, _name in (("keepidle", "TCP_KEEPIDLE"), ("keepintvl", "TCP_KEEPINTVL"), ("keepcnt", "TCP_KEEPCNT")):
+    if hasattr(socket, _name):
+        _OPTIONS[_key] = (socket.IPPROTO_TCP, getattr(socket, _name))
+
+
+def resolve_profile(profile=DEFAULT_PROFILE, **overrides):
+    """
+    Args:
+        profile: name of a SOCKET_PROFILES entry, or a profile dict
+        overrides: profile keys to replace; None values are ignored (e.g. unset CLI flags)
+    Returns:
+        profile dict
+    Raises:
+        ValueError for an unknown profile name or key
+    """
+    if isinstance(profile, str):
+        if profile not in SOCKET_PROFILES:
+            raise ValueError(f"unknown socket profile: {profile}")
+        profile = SOCKET_PROFILES[profile]
+    resolved = dict(profile)
+    for key, value in overrides.items():
+        if key not in resolved:
+            raise ValueError(f"unknown socket option: {key}")
+        if value is not None:
+            resolved[key] = value
+    return resolved
+
+
+def apply_socket_profile(sock, profile=DEFAULT_PROFILE):
+    """
+    Sets the options of a profile on a connected TCP socket. Options the
+    platform lacks, or that the socket refuses, are skipped.
+    Args:
+        sock: socket.socket (or asyncio's TransportSocket)
+        profile: name of a SOCKET_PROFILES entry, or a profile dict
+    Returns:
+        dict of the options that were set
+    """
+    if isinstance(profile, str):
+        profile = resolve_profile(profile)
+    applied = {}
+    for key, (level, option) in _OPTIONS.items():
+        value = profile.get(key)
+        if value is None or (key.startswith("keep") and key != "keepalive" and not profile.get("keepalive")):
+            continue
+        try:
+            sock.setsockopt(level, option, int(value))
+        except OSError:
+            continue
+        applied[key] = value
+    return applied
+
+
+def send_coalesced(sock, buffers):
+    """
+    Sends several prepared buffers with one writev (sendmsg) call instead of one
+    sendall each, so they leave in as few segments as possible. Blocking sockets only.
+    Args:
+        buffers: list of bytes-like objects (empty ones are skipped)
+    """
+    buffers = [memoryview(buffer) for buffer in buffers if buffer]
+    if not hasattr(sock, "sendmsg"):
+        sock.sendall(b"".join(buffers))
+        return
+    while buffers:
+        sent = sock.sendmsg(buffers)
+        # Drop what went out; a partial write leaves the rest for the next call
+        while buffers and sent >= len(buffers[0]):
+            sent -= len(buffers.pop(0))
+        if sent:
+            buffers[0] = buffers[0][sent:]
@@ -1,126 +1,173 @@
-# utils/solver.py
-import re
-import base64
-
-def solve_challenge(text):
-    """
-    Solves challenges based on the received text.
-    """
-    # Extract only the last line containing the challenge to avoid accumulation.
-    lines = text.strip().split('\n')
-    current_challenge = lines[-1] if lines else text
-
-    # BINARY LOGIC OPERATIONS (8-bit)
-
-    # Binary AND: "Binary AND: 10110101 AND 11001100 = ?"
-    if "Binary AND:" in current_challenge:
-        match = re.search(r'Binary AND:\s*(\d+)\s+AND\s+(\d+)', current_challenge)
-        if match:
-            a = int(match.group(1), 2)  # Convert from binary to decimal
-            b = int(match.group(2), 2)
-            result = a & b
-            return bin(result)[2:]  # Return without the 0b prefix
-
-    # Binary OR: "Binary OR: 10110101 OR 11001100 = ?"
-    if "Binary OR:" in current_challenge:
-        match = re.search(r'Binary OR:\s*(\d+)\s+OR\s+(\d+)', current_challenge)
-        if match:
-            a = int(match.group(1), 2)
-            b = int(match.group(2), 2)
-            result = a | b
-            return bin(result)[2:]
-
-    # Binary XOR: "Binary XOR: 10110101 XOR 11001100 = ?"
-    if "Binary XOR:" in current_challenge:
-        match = re.search(r'Binary XOR:\s*(\d+)\s+XOR\s+(\d+)', current_challenge)
-        if match:
-            a = int(match.group(1), 2)
-            b = int(match.group(2), 2)
-            result = a ^ b
-            return bin(result)[2:]
-
-    # Binary NOR: "Binary NOR (8-bit): 10110101 NOR 11001100 = ?"
-    if "Binary NOR" in current_challenge:
-        match = re.search(r'Binary NOR.*?:\s*(\d+)\s+NOR\s+(\d+)', current_challenge)
-        if match:
-            a = int(match.group(1), 2)
-            b = int(match.group(2), 2)
-            result = ~(a | b) & 0xFF  # Apply 8-bit mask
-            return bin(result)[2:]
-
-    # Binary NAND: "Binary NAND (8-bit): 10110101 NAND 11001100 = ?"
-    if "Binary NAND" in current_challenge:
-        match = re.search(r'Binary NAND.*?:\s*(\d+)\s+NAND\s+(\d+)', current_challenge)
-        if match:
-            a = int(match.group(1), 2)
-            b = int(match.group(2), 2)
-            result = ~(a & b) & 0xFF  # Apply 8-bit mask
-            return bin(result)[2:]
-
-    # Binary NOT: "Binary NOT (8-bit): NOT 10110101 = ?"
-    if "Binary NOT" in current_challenge:
-        match = re.search(r'NOT\s+(\d+)', current_challenge)
-        if match:
-            a = int(match.group(1), 2)
-            result = ~a & 0xFF  # Apply 8-bit mask
-            return bin(result)[2:]
-
-    # Complex Logic: "Calculate: (1010 AND 1100) XOR 1111 = ?"
-    if "Calculate:" in current_challenge and "AND" in current_challenge and "XOR" in current_challenge:
-        # Extract binary numbers from the expression
-        match = re.search(r'\((\d+)\s+AND\s+(\d+)\)\s+XOR\s+(\d+)', current_challenge)
-        if match:
-            a = int(match.group(1), 2)
-            b = int(match.group(2), 2)
-            c = int(match.group(3), 2)
-            result = (a & b) ^ c
-            return bin(result)[2:]
-
-    # EXISTING CHALLENGES
-
-    # Reverse string: "Reverse this string: hello"
-    if "Reverse" in current_challenge:
-        match = re.search(r'Reverse this string:\s*(\w+)', current_challenge)
-        if match:
-            return match.group(1)[::-1]
-
-    # Hex to Decimal: "Convert hex to decimal: 0xb0"
-    if "hex to decimal" in current_challenge:
-        match = re.search(r'0x([0-9a-fA-F]+)', current_challenge)
-        if match:
-            return str(int(match.group(1), 16))
-
-    # Base64: "Decode this base64: aGVsbG8="
-    if "base64" in current_challenge:
-        match = re.search(r'base64:\s*([A-Za-z0-9+/=]+)', current_challenge)
-        if match:
-            try:
-                return base64.b64decode(match.group(1)).decode()
-            except:
-                pass
-
-    # Math expression: "What is X + Y?" - Check complete expression FIRST
-    if "What is" in current_challenge:
-        match = re.search(r'What is (.+)\?', current_challenge)
-        if match:
-            try:
-                expression = match.group(1).strip()
-                return str(eval(expression))
-            except:
-                pass
-
-    # Simple addition: "45 + 32" (if not already solved by the 'What is' check)
-    if "+" in current_challenge and "What is" not in current_challenge:
-        match = re.search(r'(\d+)\s*\+\s*(\d+)', current_challenge)
-        if match:
-            return str(int(match.group(1)) + int(match.group(2)))
-
-    # Sequence: "Next number in sequence: 2, 4, 6, 8, ?"
-    if "sequence" in current_challenge and "?" in current_challenge:
-        numbers = re.findall(r'\d+', current_challenge)
-        if len(numbers) >= 2:
-            nums = [int(n) for n in numbers]
-            diff = nums[-1] - nums[-2]
-            return str(nums[-1] + diff)
-
-    return "UNKNOWN"
\ No newline at end of file
+# utils/solver.py
+import base64
+
+from utils.arith import evaluate, format_int
+from utils.cache import ResultCache, normalize_challenge
+from utils.encoders import (binary_and, binary_nand, binary_nor, binary_not, binary_or, binary_xor,
+                            complex_binary_logic)
+from utils.parsers import classify_challenge
+from utils.sequences import next_term
+
+
+# BINARY LOGIC OPERATIONS
+# Operands of any length go through utils.bitvec (via utils.encoders). NOR, NAND
+# and NOT are masked to the declared "(N-bit)" width; without one (and always for
+# AND, OR, XOR and complex logic) the solver opts out of the encoders' 8-bit default
+# with bit_width=None: at least 8 bits, widened to the operand length.
+
+def _width(declared):
+    return int(declared) if declared else None
+
+def _solve_and(a, b):
+    # Binary AND: "Binary AND: 10110101 AND 11001100 = ?"
+    return binary_and(a, b, None)  # Return without the 0b prefix
+
+def _solve_or(a, b):
+    # Binary OR: "Binary OR: 10110101 OR 11001100 = ?"
+    return binary_or(a, b, None)
+
+def _solve_xor(a, b):
+    # Binary XOR: "Binary XOR: 10110101 XOR 11001100 = ?"
+    return binary_xor(a, b, None)
+
+def _solve_nor(width, a, b):
+    # Binary NOR: "Binary NOR (8-bit): 10110101 NOR 11001100 = ?"
+    return binary_nor(a, b, _width(width))
+
+def _solve_nand(width, a, b):
+    # Binary NAND: "Binary NAND (8-bit): 10110101 NAND 11001100 = ?"
+    return binary_nand(a, b, _width(width))
+
+def _solve_not(width, a):
+    # Binary NOT: "Binary NOT (8-bit): NOT 10110101 = ?"
+    return binary_not(a, _width(width))
+
+def _solve_complex_logic(a, b, c):
+    # Complex Logic: "Calculate: (1010 AND 1100) XOR 1111 = ?"
+    return complex_binary_logic(a, b, c, None)
+
+
+# EXISTING CHALLENGES
+
+def _solve_reverse(word):
+    # Reverse string: "Reverse this string: hello"
+    return word[::-1]
+
+def _solve_hex(digits):
+    # Hex to Decimal: "Convert hex to decimal: 0xb0"
+    return format_int(int(digits, 16))
+
+def _solve_base64(encoded):
+    # Base64: "Decode this base64: aGVsbG8="
+    return base64.b64decode(encoded).decode()
+
+def _solve_math(expression):
+    # Math expression: "What is X + Y?"
+    return format_int(evaluate(expression))
+
+def _solve_addition(a, b):
+    # Simple addition: "45 + 32"
+    return str(int(a) + int(b))
+
+def _solve_sequence(body):
+    # Sequence: "Next number in sequence: 2, 4, 6, 8, ?"
+    # Arithmetic, geometric, polynomial, recurrence and alternating rules (utils.sequences)
+    following = next_term(tuple(int(n) for n in body.replace(',', ' ').split()))
+    return str(following) if following is not None else None
+
+
+# Challenge type (as returned by utils.parsers.classify_challenge) -> solver.
+# Each solver receives the extracted operands and returns the answer string.
+SOLVERS = {
+    "binary_and": _solve_and,
+    "binary_or": _solve_or,
+    "binary_xor": _solve_xor,
+    "binary_nor": _solve_nor,
+    "binary_nand": _solve_nand,
+    "binary_not": _solve_not,
+    "complex_logic": _solve_complex_logic,
+    "reverse": _solve_reverse,
+    "hex_to_decimal": _solve_hex,
+    "base64": _solve_base64,
+    "math": _solve_math,
+    "addition": _solve_addition,
+    "sequence": _solve_sequence,
+}
+
+# (challenge type, answer) of already solved challenges, keyed by the challenge
+# text without its "[Challenge i/N]" prefix. Replace it with configure_cache().
+CACHE = ResultCache()
+
+def configure_cache(maxsize=4096, policy="lru", path=None):
+    """
+    Replaces the solver cache
+    Args:
+        maxsize: maximum number of cached answers (0 disables caching)
+        policy: 'lru' or 'fifo'
+        path: JSON file to load entries from (and to save to with CACHE.save())
+    Returns:
+        the new ResultCache
+    """
+    global CACHE
+    CACHE = ResultCache(maxsize, policy, path)
+    return CACHE
+
+def solve_line(line, classified=None):
+    """
+    Solves a single challenge line (str or bytes), without the cache.
+    Args:
+        classified: classify_challenge(line), if the caller already has it
+    Returns:
+        tuple (challenge_type, answer); answer is "UNKNOWN" if it cannot be solved
+    """
+    challenge_type, operands = classified if classified is not None else classify_challenge(line)
+    solver = SOLVERS.get(challenge_type)
+    if solver is None:
+        return challenge_type, "UNKNOWN"
+
+    try:
+        answer = solver(*operands)
+    except Exception:
+        return challenge_type, "UNKNOWN"
+    return challenge_type, answer if answer is not None else "UNKNOWN"
+
+def solve_frame(line, classified=None):
+    """
+    Solves one complete challenge line received as bytes (or a memoryview from
+    utils.framing.LineFramer), consulting the cache first. The line is never
+    decoded as a whole - only the extracted operands are.
+    Args:
+        classified: classify_challenge(line), if the caller already has it
+    Returns:
+        tuple (challenge_type, answer)
+    """
+    key = normalize_challenge(line)
+    # Only answers are cached, so a hit is always a challenge; a miss is counted
+    # once the line is known to be one (banner and results lines do not count)
+    cached = CACHE.get(key, count_miss=False)
+    if cached is not None:
+        return cached[0], cached[1]
+
+    challenge_type, answer = solve_line(line, classified)
+    if challenge_type != "unknown":
+        CACHE.record_miss()
+    if answer != "UNKNOWN":
+        CACHE.put(key, (challenge_type, answer))
+    return challenge_type, answer
+
+def solve_typed(text):
+    """
+    Like solve_challenge, but also returns the challenge type.
+    Returns:
+        tuple (challenge_type, answer)
+    """
+    # Extract only the last line containing the challenge to avoid accumulation.
+    lines = text.strip().split('\n')
+    current_challenge = lines[-1] if lines else text
+    return solve_frame(current_challenge.encode())
+
+def solve_challenge(text):
+    """
+    Solves challenges based on the received text.
+    """
+    return solve_typed(text)[1]
@@ -0,0 +1,40 @@
+# utils/stats.py
+
+
+def percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an already sorted list
+    Args:
+        sorted_values: list sorted in ascending order
+        pct: percentile between 0 and 100
+    Returns:
+        the value at that percentile, or None for an empty list
+    """
+    if not sorted_values:
+        return None
+    rank = int(round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[min(max(rank, 0), len(sorted_values) - 1)]
+
+
+def summarize_latencies(latencies, scale=1000.0):
+    """
+    Summarizes a latency sample
+    Args:
+        latencies: iterable of durations in seconds
+        scale: multiplier applied to every value (default: report milliseconds)
+    Returns:
+        dict with count, mean, min, p50, p90, p95, p99 and max
+    """
+    values = sorted(v * scale for v in latencies)
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "min": values[0],
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": values[-1],
+    }
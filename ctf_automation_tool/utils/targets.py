@@ -0,0 +1,75 @@
+# utils/targets.py
+import json
+import random
+
+# Settings of a target that the targets file may leave out
+#   sessions:    sessions to run against the target
+#   concurrency: sessions in flight against the target at once
+#   retries:     extra attempts for a session whose connection fails
+#   backoff:     first retry delay in seconds, doubled after every consecutive failure
+#   max_backoff: cap of the retry delay
+#   idle_timeout: seconds a session may wait for server output
+TARGET_DEFAULTS = {
+    "sessions": 1,
+    "concurrency": 1,
+    "retries": 5,
+    "backoff": 0.5,
+    "max_backoff": 30.0,
+    "idle_timeout": 150.0,
+}
+
+
+def _parse_target(entry, defaults):
+    if isinstance(entry, str):
+        host, _, port = entry.rpartition(":")
+        entry = {"host": host, "port": port}
+    if "host" not in entry or "port" not in entry:
+        raise ValueError(f"target needs a host and a port: {entry!r}")
+    target = dict(defaults)
+    target.update(entry)
+    target["port"] = int(target["port"])
+    for key in ("sessions", "concurrency", "retries"):
+        target[key] = int(target[key])
+    for key in ("backoff", "max_backoff", "idle_timeout"):
+        target[key] = float(target[key])
+    if target["sessions"] < 0 or target["concurrency"] < 1:
+        raise ValueError(f"target {entry!r}: sessions must be >= 0 and concurrency >= 1")
+    target.setdefault("name", f"{target['host']}:{target['port']}")
+    return target
+
+
+def load_targets(path):
+    """
+    Reads the services to play from a JSON file, either a list of targets or
+        {"defaults": {"sessions": 10, "concurrency": 2},
+         "targets": [{"name": "team1", "host": "10.0.1.5", "port": 5000}, "10.0.2.5:5000"]}
+    A target is an object with host, port and optionally name plus any TARGET_DEFAULTS
+    key, or a "host:port" string
+    Returns:
+        list of target dicts with every TARGET_DEFAULTS key filled in
+    Raises:
+        ValueError for malformed targets or duplicate names
+    """
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {"targets": data}
+    defaults = dict(TARGET_DEFAULTS)
+    defaults.update(data.get("defaults", {}))
+    targets = [_parse_target(entry, defaults) for entry in data.get("targets", [])]
+    names = [target["name"] for target in targets]
+    if len(set(names)) != len(names):
+        raise ValueError("target names must be unique")
+    return targets
+
+
+def backoff_delay(target, failures, rng=random):
+    """
+    Returns:
+        seconds to wait after `failures` consecutive connection failures: exponential,
+        capped at max_backoff, with jitter so sessions of one target do not retry in lockstep
+    """
+    if failures <= 0:
+        return 0.0
+    delay = min(target["backoff"] * 2 ** min(failures - 1, 32), target["max_backoff"])
+    return delay * rng.uniform(0.5, 1.0)